@@ -0,0 +1,4 @@
+"""卡牌游戏：无界面对局引擎与 Tk 前端"""
+from .cards import Attribute, Card, CARDS, card_by_id, deck_ids, deck_from_ids, deck_key, generate_random_deck
+from .engine import Deck, Player, NPC, Match, MatchState, random_policy, run_match, PLAYER_WIN, NPC_WIN, DRAW
+from .rng import RNGStreams, derive_seed
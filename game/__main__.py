@@ -0,0 +1,431 @@
+import argparse
+import time
+
+
+def simulate(args):
+    from .engine import run_match, PLAYER_WIN, NPC_WIN
+    from .effects import ALL_EFFECTS
+
+    effects = ALL_EFFECTS if args.effects else None
+    if args.rules:
+        from .rulesets import compile_ruleset, run_match as run_ruleset_match
+
+        if args.effects:
+            raise SystemExit("--rules 已经决定了卡牌效果，不能再加 --effects")
+        compile_ruleset(args.rules)
+
+        def play_one(seed):
+            return run_ruleset_match(args.rules, seed)
+    else:
+        def play_one(seed):
+            return run_match(seed, effects=effects)
+
+    wins = losses = rounds = 0
+    start = time.perf_counter()
+    for i in range(args.matches):
+        match = play_one(args.seed + i)
+        wins += match.winner == PLAYER_WIN
+        losses += match.winner == NPC_WIN
+        rounds += match.round
+    elapsed = time.perf_counter() - start
+    n = args.matches
+    print(f"对局数：{n}  玩家胜：{wins}  NPC胜：{losses}  平局：{n - wins - losses}")
+    print(f"平均回合：{rounds / n:.2f}  耗时：{elapsed:.2f}s  ({n / elapsed:.0f} 局/秒)")
+
+
+def batch(args):
+    from .batch import derive_seed, random_decks, simulate_decks, format_report
+
+    decks = random_decks(args.decks, args.seed)
+    start = time.perf_counter()
+    if args.vector:
+        from .vector import run_matches
+        results = [run_matches(args.matches, derive_seed(args.seed, "vector", i), player_deck=deck).stats()
+                   for i, deck in enumerate(decks)]
+    else:
+        results = simulate_decks(decks, args.matches, args.seed, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(format_report(decks, results))
+    total = args.decks * args.matches
+    print(f"共 {total} 局，耗时：{elapsed:.2f}s  ({total / elapsed:.0f} 局/秒)")
+
+
+def balance_sweep(args):
+    from .sweep import make_variants, sweep, format_ranking
+
+    deltas = [int(d) for d in args.deltas.split(",")]
+    variants = make_variants(deltas, args.fields.split(","), rules=args.rules)
+    start = time.perf_counter()
+    results = sweep(variants, args.seed, args.workers, args.chunk_size, args.tolerance, args.max_matches,
+                    args.rules)
+    elapsed = time.perf_counter() - start
+    print(format_ranking(results))
+    total = sum(stats.matches for stats in results.values())
+    print(f"{len(variants)} 个变体，共 {total} 局，耗时：{elapsed:.2f}s  ({total / elapsed:.0f} 局/秒)")
+
+
+def tournament(args):
+    from .tournament import Tournament, format_standings
+
+    t = Tournament(args.policies.split(","), args.pairing, args.games, args.chunk_size, args.seed,
+                   args.tolerance, args.patience, args.max_rounds)
+    start = time.perf_counter()
+    t.run(args.workers, lambda r, change: print(f"第 {r} 轮：最大评分变化 {change:.1f}"))
+    elapsed = time.perf_counter() - start
+    print(format_standings(t))
+    total = sum(stats.games for stats in t.played.values())
+    print(f"共 {total} 局，耗时：{elapsed:.2f}s  ({total / elapsed:.0f} 局/秒)")
+
+
+def build_deck(args):
+    from .deckbuilder import DeckBuilder, format_best, format_deck
+
+    builder = DeckBuilder(args.population, args.elite, args.base_matches, args.max_matches, args.mutation,
+                          args.policy, args.opponent, args.seed, args.chunk_size)
+    start = time.perf_counter()
+
+    def progress(generation, ranked):
+        stats = builder.cache[ranked[0]]
+        print(f"第 {generation} 代：最佳胜率 {stats.win_rate:.4f}（{stats.matches} 局）{format_deck(ranked[0])}")
+
+    builder.run(args.generations, args.workers, progress)
+    elapsed = time.perf_counter() - start
+    print(format_best(builder, args.top))
+    total = sum(stats.matches for stats in builder.cache.values())
+    print(f"耗时：{elapsed:.2f}s  ({total / elapsed:.0f} 局/秒)")
+
+
+def check_deck(args):
+    from .stats import check_reinsert_distribution
+
+    ok = True
+    for name, (stat, dof, p) in check_reinsert_distribution(args.trials, args.seed).items():
+        ok &= p >= args.alpha
+        print(f"{name}: 卡方={stat:.1f} 自由度={dof} p={p:.4f} {'一致' if p >= args.alpha else '不一致'}")
+    return 0 if ok else 1
+
+
+def serve(args):
+    import asyncio
+    from .server import serve as run_server
+
+    npc_policy = None
+    if args.npc == "mcts":
+        from .mcts import MCTSNPC
+        npc_policy = lambda: MCTSNPC(budget_ms=args.budget_ms)
+    try:
+        asyncio.run(run_server(args.host, args.port, npc_policy))
+    except KeyboardInterrupt:
+        pass
+
+
+def loadgen(args):
+    import asyncio
+    from .loadgen import run_load, format_load
+
+    stats = asyncio.run(run_load(args.clients, args.matches, args.host, args.port, args.concurrency, args.seed))
+    print(format_load(stats))
+    return 1 if stats["errors"] else 0
+
+
+def bench(args):
+    from .bench import run_benchmarks, quietest, save_baseline, load_baseline, baseline_path, compare, recheck
+
+    if args.save:
+        # 记录基准时多跑几次，每项取噪声最小的一次
+        results = quietest(args.only, args.min_time)
+        save_baseline(results, args.save)
+        print(f"已保存到 {baseline_path(args.save)}")
+    else:
+        results = run_benchmarks(args.only, args.min_time)
+    try:
+        baseline = load_baseline(args.compare)
+    except FileNotFoundError:
+        baseline = {}
+        print(f"没有基准 {baseline_path(args.compare)}，只显示本次结果")
+    if not args.save:
+        recheck(results, baseline, args.min_time)  # 超出允许值的项目先重新计时再报告
+    report, regressions = compare(results, baseline)
+    print(report)
+    if regressions:
+        # 只做提示；回归检查由 GAME_BENCH=1 python -m pytest tests/test_bench.py 完成
+        print(f"{len(regressions)} 项可能退化：{', '.join(regressions)}")
+
+
+def startup(args):
+    from .bench import measure_startup, format_startup
+
+    result = measure_startup(args.cmd or ["simulate", "-n", "1"], args.runs)
+    print(format_startup(result))
+    if result["forbidden"] or result["wall_ms"] > args.budget_ms:
+        print(f"启动超过 {args.budget_ms}ms 或加载了界面模块")
+        return 1
+    return 0
+
+
+def ui_bench(args):
+    from .uibench import time_turns, report
+
+    print(report(time_turns(args.turns, args.seed)))
+
+
+def record(args):
+    from .replay import record_matches
+
+    start = time.perf_counter()
+    record_matches(args.out, args.matches, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"已追加 {args.matches} 局到 {args.out}，耗时：{elapsed:.2f}s  ({args.matches / elapsed:.0f} 局/秒)")
+
+
+def replay(args):
+    from .engine import PLAYER_WIN, NPC_WIN
+    from .replay import ReplayReader, replay as replay_record
+
+    names = {PLAYER_WIN: "玩家胜", NPC_WIN: "NPC胜", None: "未结束"}
+    with ReplayReader(args.file) as reader:
+        indices = args.index if args.index else range(len(reader))
+        for n in indices:
+            rec = reader[n]
+            match = replay_record(rec)
+            if args.index:
+                print(f"第 {n} 局：种子={rec.seed}  {names.get(match.winner, '平局')}  回合={match.round}  "
+                      f"玩家生命={match.player.health}  NPC生命={match.npc.health}")
+        print(f"共 {len(reader)} 局，已校验 {len(indices)} 局，回放结果与记录一致")
+
+
+def play(args):
+    from .engine import Match
+    from .gui import Game
+
+    npc_policy = None
+    if args.npc == "mcts":
+        from .mcts import MCTSNPC
+        npc_policy = MCTSNPC(budget_ms=args.budget_ms)
+    elif args.npc == "endgame":
+        from .policies import POLICIES
+        npc_policy = POLICIES["endgame"]()
+    match = Match(npc_policy=npc_policy) if npc_policy else None
+    recorder = None
+    if args.record:
+        from .replay import ReplayWriter
+        recorder = ReplayWriter(args.record)
+    instrumentation = None
+    if args.trace or args.pstats:
+        from .profiling import Instrumentation
+        instrumentation = Instrumentation(profile=bool(args.pstats))
+    try:
+        Game(match, recorder, instrumentation, args.art, args.scale).start_gui()
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if instrumentation is not None:
+            instrumentation.uninstall()
+            export_profile(instrumentation, args)
+
+
+def watch(args):
+    from .gui import Spectator
+    from .policies import POLICIES
+
+    speed = None if args.speed == "max" else int(args.speed)
+    Spectator(POLICIES[args.player], POLICIES[args.npc], args.games, speed, args.seed,
+              art_dir=args.art, scale=args.scale, frame_ms=round(1000 / args.fps)).start_gui()
+
+
+def export_profile(instrumentation, args):
+    print(instrumentation.report())
+    if args.trace:
+        instrumentation.dump_chrome_trace(args.trace)
+        print(f"Chrome trace 已写入 {args.trace}")
+    if args.pstats:
+        instrumentation.dump_pstats(args.pstats)
+        print(f"pstats 已写入 {args.pstats}")
+
+
+def profile(args):
+    from .engine import Match, random_policy, MAX_ROUNDS
+    from .profiling import Instrumentation
+
+    npc_policy = random_policy
+    if args.npc == "mcts":
+        from .mcts import MCTSNPC
+        npc_policy = MCTSNPC(budget_ms=args.budget_ms)
+    instrumentation = Instrumentation(profile=bool(args.pstats))
+    for i in range(args.matches):
+        # 与 run_match 相同的流程，只是在第一回合开始前装上计时
+        match = Match(npc_policy=npc_policy, seed=args.seed + i)
+        instrumentation.install(match)
+        match.start_turn()
+        while match.winner is None:
+            match.step(random_policy(match.player, match.npc, match.player_policy_rng, match), MAX_ROUNDS)
+    instrumentation.uninstall()
+    export_profile(instrumentation, args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="game", description="卡牌游戏")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("play", help="启动 Tk 界面（默认）")
+    p.add_argument("--npc", choices=("random", "mcts", "endgame"), default="random",
+                   help="endgame：残局时用有限深度搜索，其余同 restraint")
+    p.add_argument("--budget-ms", type=int, default=150, help="MCTS 每步的思考时间（毫秒）")
+    p.add_argument("--record", metavar="FILE", help="把对局追加到回放文件")
+    p.add_argument("--trace", metavar="FILE", help="退出时导出各阶段耗时的 Chrome trace JSON")
+    p.add_argument("--pstats", metavar="FILE", help="开启 cProfile，退出时导出 pstats 文件")
+    p.add_argument("--art", metavar="DIR", help="卡图目录（文件名为卡牌名，支持 png/gif/ppm）")
+    p.add_argument("--scale", type=float, default=1.0, help="卡图和按钮字体的缩放比例")
+
+    p = sub.add_parser("watch", help="观战模式：双方都由策略出牌，可加速到全速，界面按固定帧率刷新")
+    p.add_argument("--player", choices=("random", "greedy", "restraint", "rollout", "endgame", "belief"), default="restraint")
+    p.add_argument("--npc", choices=("random", "greedy", "restraint", "rollout", "endgame", "belief"), default="random")
+    p.add_argument("--games", type=int, default=10, help="连续观看的局数")
+    p.add_argument("--speed", choices=("1", "4", "16", "64", "max"), default="1",
+                   help="速度倍率（1 倍为每秒 5 回合），max 为全速")
+    p.add_argument("--fps", type=int, default=30, help="界面刷新的帧率上限")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--art", metavar="DIR", help="卡图目录（文件名为卡牌名，支持 png/gif/ppm）")
+    p.add_argument("--scale", type=float, default=1.0, help="卡图和按钮字体的缩放比例")
+
+    p = sub.add_parser("profile", help="无界面跑几局并统计各阶段耗时、内存块净增量和随机数调用")
+    p.add_argument("-n", "--matches", type=int, default=200)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--npc", choices=("random", "mcts"), default="random")
+    p.add_argument("--budget-ms", type=int, default=20, help="MCTS 每步的思考时间（毫秒）")
+    p.add_argument("--trace", metavar="FILE", help="导出 Chrome trace JSON")
+    p.add_argument("--pstats", metavar="FILE", help="开启 cProfile 并导出 pstats 文件")
+
+    p = sub.add_parser("simulate", help="无界面批量模拟对局")
+    p.add_argument("-n", "--matches", type=int, default=10000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--effects", action="store_true", help="启用 heal / energy_gain 卡牌效果（test0.1 的规则）")
+    p.add_argument("--rules", choices=("test0.1", "test0.2.0", "test0.2.1", "test0.2.2"),
+                   help="按历史版本的规则模拟（编译成专用的回合函数）")
+
+    p = sub.add_parser("record", help="模拟对局并追加到二进制回放文件")
+    p.add_argument("out", metavar="FILE")
+    p.add_argument("-n", "--matches", type=int, default=10000)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("replay", help="回放并校验回放文件中的对局")
+    p.add_argument("file", metavar="FILE")
+    p.add_argument("index", type=int, nargs="*", help="要显示的对局编号，默认校验全部")
+
+    p = sub.add_parser("batch", help="多进程蒙特卡洛评估随机牌组胜率")
+    p.add_argument("--decks", type=int, default=4)
+    p.add_argument("-n", "--matches", type=int, default=100000, help="每个牌组的对局数")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--chunk-size", type=int, default=2000)
+    p.add_argument("--vector", action="store_true", help="使用 NumPy 向量化引擎（需要 numpy）")
+
+    p = sub.add_parser("sweep", help="并行扫描卡牌数值，按胜率排出偏强/偏弱的卡")
+    p.add_argument("--deltas", default="-1,1", help="每项数值的调整量，逗号分隔")
+    p.add_argument("--fields", default="value,cost,effect", help="调整项：value,cost,effect")
+    p.add_argument("--rules", choices=("test0.1", "test0.2.0", "test0.2.1", "test0.2.2"), default="test0.2.2",
+                   help="按哪个版本的规则对战（决定 heal / energy_gain 是否生效），默认为当前版本")
+    p.add_argument("--tolerance", type=float, default=0.02, help="胜率 95%% 区间半宽达到这个值就停止")
+    p.add_argument("--max-matches", type=int, default=20000, help="每个变体最多的对局数")
+    p.add_argument("--chunk-size", type=int, default=500)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("tournament", help="NPC策略循环赛或瑞士制对战，按 Elo 排名")
+    p.add_argument("--policies", default="random,greedy,restraint,rollout", help="参赛策略，逗号分隔")
+    p.add_argument("--pairing", choices=("round-robin", "swiss"), default="round-robin")
+    p.add_argument("--games", type=int, default=20, help="每轮每个组合的对局数（换座位成对）")
+    p.add_argument("--tolerance", type=float, default=2.0, help="一轮内评分变化都小于这个值视为收敛")
+    p.add_argument("--patience", type=int, default=2, help="连续收敛这么多轮后停止")
+    p.add_argument("--max-rounds", type=int, default=50)
+    p.add_argument("--chunk-size", type=int, default=10, help="每个任务的种子数")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("deckbuild", help="遗传算法搜索胜率最高的 15 张牌组（适应度并行评估并缓存）")
+    p.add_argument("--generations", type=int, default=10)
+    p.add_argument("--population", type=int, default=24)
+    p.add_argument("--elite", type=int, default=4, help="每代直接保留、并跑满对局数的牌组数")
+    p.add_argument("--base-matches", type=int, default=200, help="新牌组先跑的对局数")
+    p.add_argument("--max-matches", type=int, default=3200, help="逐轮淘汰时每个牌组最多的对局数")
+    p.add_argument("--mutation", type=float, default=0.5, help="子代发生变异的概率")
+    p.add_argument("--policy", default="random", help="候选牌组一方使用的策略")
+    p.add_argument("--opponent", default="random", help="参照对手的策略（对手每局使用随机牌组）")
+    p.add_argument("--top", type=int, default=5, help="最后列出的牌组数")
+    p.add_argument("--chunk-size", type=int, default=100)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("check-deck", help="检验各放回方式的抽牌分布与整体重洗一致")
+    p.add_argument("--trials", type=int, default=30000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--alpha", type=float, default=0.001)
+
+    p = sub.add_parser("serve", help="启动 asyncio 对局服务器（按行文本协议，见 game/server.py）")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=7777)
+    p.add_argument("--npc", choices=("random", "mcts"), default="random")
+    p.add_argument("--budget-ms", type=int, default=50, help="MCTS 每步的思考时间（毫秒），在线程池里计算")
+
+    p = sub.add_parser("loadgen", help="模拟大量客户端压测对局服务器")
+    p.add_argument("--clients", type=int, default=10000)
+    p.add_argument("-n", "--matches", type=int, default=1, help="每个客户端打的局数")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=None, help="不给时在本进程内启动服务器")
+    p.add_argument("--concurrency", type=int, default=None, help="同时在线的客户端上限，默认全部")
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("bench", help="规则热点路径的性能基准，与保存的基准比较")
+    p.add_argument("--compare", default="baseline", metavar="NAME", help="比较的基准（benchmarks/NAME.json）")
+    p.add_argument("--save", metavar="NAME", help="把本次结果保存为基准")
+    p.add_argument("--only", nargs="*", help="只运行名字包含这些字符串的项目")
+    p.add_argument("--min-time", type=float, default=0.3, help="每个项目的最少计时秒数")
+
+    p = sub.add_parser("startup", help="用 -X importtime 测量无界面命令的启动时间")
+    p.add_argument("--runs", type=int, default=10)
+    p.add_argument("--budget-ms", type=float, default=100, help="启动时间中位数的上限（含解释器本身）")
+    p.add_argument("cmd", nargs="*", help="要测量的子命令及参数，默认 simulate -n 1")
+
+    p = sub.add_parser("ui-bench", help="测量每回合界面刷新和布局的耗时（需要显示器）")
+    p.add_argument("--turns", type=int, default=300)
+    p.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command == "simulate":
+        simulate(args)
+    elif args.command == "record":
+        record(args)
+    elif args.command == "replay":
+        replay(args)
+    elif args.command == "batch":
+        batch(args)
+    elif args.command == "sweep":
+        balance_sweep(args)
+    elif args.command == "tournament":
+        tournament(args)
+    elif args.command == "deckbuild":
+        build_deck(args)
+    elif args.command == "check-deck":
+        return check_deck(args)
+    elif args.command == "watch":
+        watch(args)
+    elif args.command == "profile":
+        profile(args)
+    elif args.command == "serve":
+        serve(args)
+    elif args.command == "loadgen":
+        return loadgen(args)
+    elif args.command == "bench":
+        return bench(args)
+    elif args.command == "startup":
+        return startup(args)
+    elif args.command == "ui-bench":
+        ui_bench(args)
+    else:
+        if args.command is None:
+            args = parser.parse_args(["play"])
+        play(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
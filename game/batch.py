@@ -0,0 +1,152 @@
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .cards import generate_random_deck
+from .rng import derive_seed
+from .engine import run_match, random_policy, PLAYER_WIN, NPC_WIN, MAX_ROUNDS
+
+Z_95 = 1.959964  # 95% 置信区间
+
+
+# 流式汇总的对局统计，只保存计数和累加值
+class MatchStats:
+    def __init__(self):
+        self.matches = 0
+        self.wins = 0
+        self.losses = 0
+        self.rounds = 0
+        self.rounds_sq = 0
+
+    def add(self, match):
+        self.matches += 1
+        if match.winner == PLAYER_WIN:
+            self.wins += 1
+        elif match.winner == NPC_WIN:
+            self.losses += 1
+        self.rounds += match.round
+        self.rounds_sq += match.round * match.round
+
+    def merge(self, other):
+        self.matches += other.matches
+        self.wins += other.wins
+        self.losses += other.losses
+        self.rounds += other.rounds
+        self.rounds_sq += other.rounds_sq
+        return self
+
+    @property
+    def draws(self):
+        return self.matches - self.wins - self.losses
+
+    @property
+    def win_rate(self):
+        return self.wins / self.matches if self.matches else 0.0
+
+    def win_rate_interval(self, z=Z_95):
+        """胜率的 Wilson 置信区间"""
+        n = self.matches
+        if not n:
+            return 0.0, 1.0
+        p = self.wins / n
+        denom = 1 + z * z / n
+        center = (p + z * z / (2 * n)) / denom
+        half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+        return max(0.0, center - half), min(1.0, center + half)
+
+    @property
+    def avg_rounds(self):
+        return self.rounds / self.matches if self.matches else 0.0
+
+    def avg_rounds_interval(self, z=Z_95):
+        n = self.matches
+        if n < 2:
+            return 0.0, float("inf")
+        mean = self.rounds / n
+        var = max(0.0, (self.rounds_sq - n * mean * mean) / (n - 1))
+        half = z * math.sqrt(var / n)
+        return mean - half, mean + half
+
+    def __repr__(self):
+        lo, hi = self.win_rate_interval()
+        return f"MatchStats(n={self.matches}, win_rate={self.win_rate:.4f} [{lo:.4f}, {hi:.4f}], avg_rounds={self.avg_rounds:.2f})"
+
+
+def run_chunk(deck, seed, count, player_policy=random_policy, npc_policy=random_policy,
+              max_rounds=MAX_ROUNDS):
+    """在当前进程内跑 count 局，对手每局使用随机牌组"""
+    rng = random.Random(seed)
+    stats = MatchStats()
+    for _ in range(count):
+        stats.add(run_match(rng.getrandbits(64), player_policy, npc_policy,
+                            player_deck=deck, max_rounds=max_rounds))
+    return stats
+
+
+def iter_chunks(num_decks, matches, chunk_size):
+    for deck_index in range(num_decks):
+        for chunk_index, start in enumerate(range(0, matches, chunk_size)):
+            yield deck_index, chunk_index, min(chunk_size, matches - start)
+
+
+def simulate_decks(decks, matches, master_seed=0, workers=None, chunk_size=2000,
+                   player_policy=random_policy, npc_policy=random_policy,
+                   max_rounds=MAX_ROUNDS):
+    """
+    每个牌组跑 matches 局，返回与 decks 对应的 MatchStats 列表。
+    任务按 (牌组, 块号) 派生种子，结果与进程数无关，可复现。
+    策略必须是模块级函数才能被子进程 pickle。
+    """
+    results = [MatchStats() for _ in decks]
+    chunks = iter_chunks(len(decks), matches, chunk_size)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for deck_index, chunk_index, count in chunks:
+            seed = derive_seed(master_seed, deck_index, chunk_index)
+            results[deck_index].merge(run_chunk(decks[deck_index], seed, count,
+                                                player_policy, npc_policy, max_rounds))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def submit_next():
+            item = next(chunks, None)
+            if item is None:
+                return False
+            deck_index, chunk_index, count = item
+            seed = derive_seed(master_seed, deck_index, chunk_index)
+            future = pool.submit(run_chunk, decks[deck_index], seed, count,
+                                 player_policy, npc_policy, max_rounds)
+            pending[future] = deck_index
+            return True
+
+        # 只保持少量任务在途，避免一次性提交上百万个 future
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)].merge(future.result())
+                submit_next()
+    return results
+
+
+def random_decks(count, master_seed=0):
+    """用主种子生成一组待评估的随机牌组"""
+    rng = random.Random(derive_seed(master_seed, "decks"))
+    return [generate_random_deck(rng) for _ in range(count)]
+
+
+def format_report(decks, results):
+    lines = ["牌组  胜率     95%区间           平均回合  95%区间          对局数"]
+    for i, (deck, stats) in enumerate(zip(decks, results)):
+        lo, hi = stats.win_rate_interval()
+        rlo, rhi = stats.avg_rounds_interval()
+        lines.append(f"{i:>4}  {stats.win_rate:.4f}  [{lo:.4f}, {hi:.4f}]  "
+                     f"{stats.avg_rounds:7.2f}  [{rlo:.2f}, {rhi:.2f}]  {stats.matches}")
+        lines.append("      " + " ".join(card.name for card in deck))
+    return "\n".join(lines)
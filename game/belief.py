@@ -0,0 +1,167 @@
+import random
+from collections import Counter
+from math import comb
+
+from .cards import BALANCED_CARDS, DECK_SIZE
+from .engine import RESTRAINT, random_policy
+
+
+# 对手手牌的信念状态：只用公开信息（卡池、对手打出过的牌、手牌张数）推断对手可能拿着什么
+class Belief:
+    """
+    模型：
+    - 对手的牌组是从卡池（默认 BALANCED_CARDS 各两张）里随机取 deck_size 张，
+      每种卡在牌组里的张数各有一个分布（先验为超几何分布）；
+    - 打出的牌会 reinsert_card 回牌堆，所以牌组组成始终不变，看到对手出过某种卡
+      只说明牌组里至少有一张；
+    - 手牌看作从牌组里均匀抽取的 hand_size 张（不考虑对手挑牌带来的偏差）。
+
+    各种卡的张数分布按相互独立处理，每次更新只改被观察到的那种卡，
+    查询时只遍历卡的种类，都是 O(卡牌种类数)。
+    """
+
+    def __init__(self, pool=BALANCED_CARDS * 2, deck_size=DECK_SIZE, hand_size=0):
+        counts = Counter(pool)
+        self.types = list(counts)
+        self.index = {card.id: i for i, card in enumerate(self.types)}
+        self.deck_size = deck_size
+        self.hand_size = hand_size
+        total = len(pool)
+        # dist[i][k]：第 i 种卡在牌组里有 k 张的概率
+        self.dist = []
+        for card in self.types:
+            n = counts[card]
+            weights = [comb(n, k) * comb(total - n, deck_size - k) for k in range(n + 1)]
+            s = sum(weights)
+            self.dist.append([w / s for w in weights])
+
+    @classmethod
+    def known_deck(cls, deck, hand_size=0):
+        """已知对手的整副牌组（只是不知道在手里还是牌堆里）"""
+        return cls(deck, len(deck), hand_size)
+
+    # 观察
+    def on_draw(self, count=1):
+        """对手抽牌（看不到是哪张），牌堆抽空时手牌不会再增加"""
+        self.hand_size = min(self.hand_size + count, self.deck_size)
+
+    def on_play(self, card):
+        """对手打出了 card：牌组里至少有一张，手牌少一张，这张牌回到牌堆"""
+        self.hand_size = max(0, self.hand_size - 1)
+        i = self.index.get(card.id)
+        if i is None:
+            return
+        dist = self.dist[i]
+        if dist[0]:
+            dist[0] = 0.0
+            s = sum(dist)
+            self.dist[i] = [p / s for p in dist]
+
+    def observe(self, result, side):
+        """按一回合的结算结果更新，side 为对手是 "player" 还是 "npc" """
+        card = result.player_card if side == "player" else result.npc_card
+        if card is not None:
+            self.on_play(card)
+
+    # 查询
+    def expected_copies(self, card):
+        dist = self.dist[self.index[card.id]]
+        return sum(k * p for k, p in enumerate(dist))
+
+    def hand_probability(self, predicate, hand_size=None):
+        """对手手牌里至少有一张满足 predicate 的卡的概率"""
+        # 满足条件的卡在牌组里的总张数分布：各种卡的张数分布逐个卷积
+        total = [1.0]
+        for card, dist in zip(self.types, self.dist):
+            if predicate(card):
+                total = convolve(total, dist)
+        return self.any_in_hand(total, hand_size)
+
+    def any_in_hand(self, total, hand_size=None):
+        """目标卡在牌组里的总张数分布为 total 时，手牌里至少有一张的概率"""
+        h = self.hand_size if hand_size is None else hand_size
+        n = self.deck_size
+        if h > n:
+            h = n
+        none = 0.0
+        for m, p in enumerate(total):
+            if p and m <= n - h:
+                none += p * comb(n - m, h) / comb(n, h)
+        return 1.0 - none
+
+    def attribute_probability(self, attribute, energy=None, next_turn=True):
+        """
+        对手（下回合抽牌后）手里有 attribute 属性、且费用不超过 energy 的卡的概率；
+        energy 为 None 时不限费用。
+        """
+        h = min(self.hand_size + 1, self.deck_size) if next_turn else self.hand_size
+        return self.hand_probability(
+            lambda card: card.attribute == attribute and (energy is None or card.cost <= energy), h)
+
+    def counter_probability(self, card, energy=None, next_turn=True, restraint=RESTRAINT):
+        """对手下回合能用克制 card 属性的牌应对的概率（没有能克制它的属性时为 0）"""
+        attributes = [a for a, target in restraint.items() if target == card.attribute]
+        if not attributes:
+            return 0.0
+        h = min(self.hand_size + 1, self.deck_size) if next_turn else self.hand_size
+        return self.hand_probability(
+            lambda c: c.attribute in attributes and (energy is None or c.cost <= energy), h)
+
+
+def convolve(total, dist):
+    merged = [0.0] * (len(total) + len(dist) - 1)
+    for a, pa in enumerate(total):
+        if pa:
+            for b, pb in enumerate(dist):
+                merged[a + b] += pa * pb
+    return merged
+
+
+def next_energy(side):
+    """side 下回合开始时的能量"""
+    return min(side.energy + side.energy_per_turn, side.max_energy)
+
+
+# 用信念出牌的策略：先手时对手还没出牌，按信念估计对手会用哪张牌应对
+class BeliefPolicy:
+    """
+    只用公开信息：对手打出过的牌（NPC 决策时的 pending_card、对手的 last_card）、
+    手牌张数和当前能量。先手时假设对手（在当前能量下）用手里让自己伤害差最小的牌应对，
+    吃亏超过 no_card_penalty 就不出；每张候选牌的期望伤害差按信念里“最好的应对是哪种卡”
+    的概率加权。后手时对方的牌已知，交给 fallback（默认 random_policy）。
+    """
+
+    def __init__(self, fallback=random_policy, pool=BALANCED_CARDS * 2, deck_size=DECK_SIZE):
+        self.fallback = fallback
+        self.belief = Belief(pool, deck_size)
+
+    def __call__(self, me, opponent, rng=random, match=None):
+        if match is None:
+            return self.fallback(me, opponent, rng)
+        belief = self.belief
+        card = match.pending_card if me is match.npc else opponent.last_card
+        if card is not None:
+            belief.on_play(card)  # 同一张牌重复观察不改变分布
+        belief.hand_size = len(opponent.hand)
+        if me is match.npc:
+            return self.fallback(me, opponent, rng, match)
+        energy = me.energy
+        choices = [i for i, c in enumerate(me.hand) if c.cost <= energy]
+        if not choices:
+            return None
+        penalty = match.no_card_penalty
+        responses = [c for c in belief.types if c.cost <= opponent.energy]
+
+        def expected(i):
+            card = me.hand[i]
+            deltas = match.MATCHUPS.delta_row(card)
+            total = [1.0]
+            covered = value = 0.0
+            # 按对手的应对从好到坏累计：P(最好的应对是 c) = P(手里有 c 或更好的) - P(手里有更好的)
+            for c in sorted((c for c in responses if deltas[c.id] < penalty), key=lambda c: deltas[c.id]):
+                total = convolve(total, belief.dist[belief.index[c.id]])
+                p = belief.any_in_hand(total)
+                value += (p - covered) * deltas[c.id]
+                covered = p
+            return value + (1.0 - covered) * penalty, -card.cost
+        return max(choices, key=expected)
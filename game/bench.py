@@ -0,0 +1,298 @@
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from .cards import BALANCED_CARDS, generate_random_deck
+from .engine import Deck, InsertDeck, LazyDeck, Match, Player, run_match
+
+# 基准结果保存在仓库里：benchmarks/<名字>.json，每个版本一份，便于逐版比较
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+THRESHOLD = 0.10  # 相对参照项目比基准慢 10% 以上视为退化
+MAX_ALLOWED = 0.15  # 噪声大的项目允许值可以放宽，但不超过这个值
+RETRIES = 3  # 超出允许值的项目重新计时的次数
+
+
+def bench_deck_draw(deck_class):
+    """抽完整副牌再全部弃掉，下一次抽牌触发弃牌堆洗回牌堆"""
+    deck = deck_class(generate_random_deck(random.Random(0)), random.Random(1))
+
+    def op():
+        for card in deck.draw(15):
+            deck.discard_card(card)
+    return op, 1
+
+
+def bench_reinsert(deck_class):
+    deck = deck_class(generate_random_deck(random.Random(0)), random.Random(1))
+
+    def op():
+        deck.reinsert_card(deck.draw_one())
+    return op, 1
+
+
+def bench_play_card():
+    """出一张牌（扣能量、放回牌堆）再补抽一张，保持手牌数不变"""
+    player = Player("玩家")
+    player.deck = LazyDeck(generate_random_deck(random.Random(0)), random.Random(1))
+    player.hand = player.deck.draw(4)
+
+    def op():
+        player.energy = 10
+        player.play_card(0)
+        player.draw_card()
+    return op, 1
+
+
+def bench_calculate_restraint():
+    """所有 16 种属性组合各算一次"""
+    match = Match(seed=0)
+    pairs = [(a.attribute, b.attribute) for a in BALANCED_CARDS[:4] for b in BALANCED_CARDS[:4]]
+    calculate_restraint = match.calculate_restraint
+
+    def op():
+        for a1, a2 in pairs:
+            calculate_restraint(a1, a2)
+    return op, len(pairs)
+
+
+def bench_battle():
+    """12×12 种卡牌组合各对战一次"""
+    match = Match(seed=0)
+    pairs = [(a, b) for a in BALANCED_CARDS for b in BALANCED_CARDS]
+    battle = match.battle
+
+    def op():
+        for a, b in pairs:
+            battle(a, b)
+    return op, len(pairs)
+
+
+def bench_full_match():
+    """固定的 10 个种子各跑一局，每次的工作量相同（换种子时对局长短不同，耗时波动很大）"""
+    seeds = range(10)
+
+    def op():
+        for seed in seeds:
+            run_match(seed)
+    return op, len(seeds)
+
+
+def bench_reference():
+    """纯 Python 的循环和整数运算。整机快慢（别的进程抢占、降频）会让所有项目一起变快变慢，
+    各项目都按同一遍里这个参照的耗时归一化后再和基准比较"""
+    def op():
+        x = 0
+        for i in range(100):
+            x += i * i
+        return x
+    return op, 100
+
+
+REFERENCE = "参照（纯 Python 循环）"
+
+# 名字 -> 构造函数，构造函数返回 (每次调用的操作, 一次操作包含的调用数)
+BENCHMARKS = {
+    "Deck.draw（含重洗）": lambda: bench_deck_draw(Deck),
+    "LazyDeck.draw（含重洗）": lambda: bench_deck_draw(LazyDeck),
+    "Deck.reinsert_card": lambda: bench_reinsert(Deck),
+    "InsertDeck.reinsert_card": lambda: bench_reinsert(InsertDeck),
+    "LazyDeck.reinsert_card": lambda: bench_reinsert(LazyDeck),
+    "Player.play_card": bench_play_card,
+    "Match.calculate_restraint": bench_calculate_restraint,
+    "Match.battle": bench_battle,
+    "run_match": bench_full_match,
+}
+
+
+def calibrate(op, min_time):
+    """找到一轮至少耗时 min_time 秒的调用次数"""
+    number = 1
+    while True:
+        elapsed = time_round(op, number)
+        if elapsed >= min_time:
+            return number
+        number *= 2
+
+
+def time_round(op, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        op()
+    return time.perf_counter() - start
+
+
+def summarize(samples, reference):
+    """
+    一个项目各遍的纳秒数 -> {"ns": 最快一遍, "ratio": 与参照最快一遍之比, "spread": 计时噪声}。
+    干扰只会让某一遍变慢，取最快的一遍最稳定；次快的一遍比最快的慢多少说明最快值本身有多准，
+    spread 是项目和参照两边的这个相对差之和。
+    """
+    def spread(values):
+        values = sorted(values)
+        return values[1] / values[0] - 1
+    return {"ns": min(samples), "ratio": min(samples) / min(reference), "spread": spread(samples) + spread(reference)}
+
+
+def run_benchmarks(names=None, min_time=0.3, repeat=15):
+    """
+    返回 {项目名: summarize 的结果}。参照和所有项目轮流各跑一轮、共 repeat 遍，
+    机器一时的负载波动只影响某一遍，整机变慢时参照也一起变慢，比值基本不变。
+    与 timeit 一样计时期间关闭垃圾回收。
+    """
+    selected = [(REFERENCE,) + bench_reference()]
+    for name, make in BENCHMARKS.items():
+        if names and not any(n in name for n in names):
+            continue
+        op, calls = make()
+        selected.append((name, op, calls))
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        numbers = {name: calibrate(op, min_time / repeat) for name, op, _ in selected}
+        samples = {name: [] for name, _, _ in selected}
+        for _ in range(repeat):
+            for name, op, calls in selected:
+                samples[name].append(time_round(op, numbers[name]) / numbers[name] / calls * 1e9)
+    finally:
+        if enabled:
+            gc.enable()
+    reference = samples[REFERENCE]
+    return {name: summarize(samples[name], reference) for name, _, _ in selected}
+
+
+def quietest(names=None, min_time=0.3, runs=3):
+    """跑 runs 次，每个项目保留噪声（spread）最小的一次，用来记录基准"""
+    best = {}
+    for _ in range(runs):
+        for name, result in run_benchmarks(names, min_time).items():
+            if name not in best or result["spread"] < best[name]["spread"]:
+                best[name] = result
+    return best
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(results, name):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(name), "w", encoding="utf-8") as f:
+        json.dump({"unit": "ns", "results": results}, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def load_baseline(name):
+    with open(baseline_path(name), encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def regression(result, base, threshold=THRESHOLD):
+    """
+    返回 (相对参照的变化, 允许的变化)；变化超过允许值即为退化。
+    允许值一般就是 threshold，两边计时噪声（spread 之和）更大时随之放宽，但不超过 MAX_ALLOWED。
+    """
+    change = result["ratio"] / base["ratio"] - 1
+    return change, max(threshold, min(result["spread"] + base["spread"], MAX_ALLOWED))
+
+
+def recheck(results, baseline, min_time=0.3, retries=RETRIES, threshold=THRESHOLD):
+    """超出允许值的项目重新计时（最多 retries 次），每项保留比值最小的一次；就地更新 results 并返回"""
+    def regressed(name):
+        if name == REFERENCE or name not in baseline:
+            return False
+        change, allowed = regression(results[name], baseline[name], threshold)
+        return change > allowed
+
+    for _ in range(retries):
+        over = [name for name in results if regressed(name)]
+        if not over:
+            break
+        for name, result in run_benchmarks(over, min_time).items():
+            if name in over and result["ratio"] < results[name]["ratio"]:
+                results[name] = result
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """返回 (报告行, 退化的项目名)；只比较两边都有的项目，参照本身不参与比较"""
+    lines = [f"{'项目':<28}{'基准(ns)':>12}{'本次(ns)':>12}{'相对变化':>10}{'允许':>8}"]
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if name == REFERENCE or base is None:
+            base_ns = f"{base['ns']:.1f}" if base else "-"
+            lines.append(f"{name:<28}{base_ns:>12}{result['ns']:>12.1f}")
+            continue
+        change, allowed = regression(result, base, threshold)
+        flag = ""
+        if change > allowed:
+            flag = "  ⚠ 退化"
+            regressions.append(name)
+        lines.append(f"{name:<28}{base['ns']:>12.1f}{result['ns']:>12.1f}{change:>+10.1%}{allowed:>8.0%}{flag}")
+    return "\n".join(lines), regressions
+
+
+# 启动时间：在子进程里用 -X importtime 跑一条命令，统计墙钟时间和各模块的导入耗时
+STARTUP_BUDGET_MS = 100
+STARTUP_FORBIDDEN = ("tkinter",)  # 无界面命令不应加载的模块
+
+
+def run_once(args, env):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + list(args), env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return (time.perf_counter() - start) * 1000, proc.stderr
+
+
+def parse_importtime(text):
+    """-X importtime 的输出 -> {模块: (自身微秒, 累计微秒)}"""
+    imports = {}
+    for line in text.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        imports[name.strip()] = (int(self_us), int(cumulative))
+    return imports
+
+
+def measure_startup(command=("simulate", "-n", "1"), runs=10):
+    """
+    返回 {"wall_ms", "interpreter_ms", "imports", "forbidden"}：python -m game <command>
+    和空解释器（python -c pass）各跑 runs 次的墙钟时间中位数，以及最后一次的导入明细。
+    子进程去掉 PYTHONDONTWRITEBYTECODE，先跑一次写好 .pyc，按正常安装后的情况计时。
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.dirname(BASELINE_DIR), env.get("PYTHONPATH")]))
+    args = ["-m", "game"] + list(command)
+    run_once(args, env)
+    walls, text = [], ""
+    for _ in range(runs):
+        wall, text = run_once(args, env)
+        walls.append(wall)
+    bare = sorted(run_once(["-c", "pass"], env)[0] for _ in range(runs))
+    imports = parse_importtime(text)
+    return {
+        "wall_ms": sorted(walls)[len(walls) // 2],
+        "interpreter_ms": bare[len(bare) // 2],
+        "imports": imports,
+        "forbidden": [name for name in imports if name.split(".")[0] in STARTUP_FORBIDDEN],
+    }
+
+
+def format_startup(result, top=10):
+    imports = result["imports"]
+    game_us = imports.get("game", (0, 0))[1]
+    lines = [f"启动耗时（中位数）：{result['wall_ms']:.1f}ms  空解释器：{result['interpreter_ms']:.1f}ms  "
+             f"game 包导入：{game_us / 1000:.1f}ms",
+             f"{'模块':<32}{'自身(ms)':>10}{'累计(ms)':>10}"]
+    for name, (self_us, cumulative) in sorted(imports.items(), key=lambda kv: -kv[1][0])[:top]:
+        lines.append(f"{name:<32}{self_us / 1000:>10.2f}{cumulative / 1000:>10.2f}")
+    if result["forbidden"]:
+        lines.append(f"⚠ 加载了不该加载的模块：{', '.join(result['forbidden'])}")
+    return "\n".join(lines)
@@ -0,0 +1,115 @@
+import random
+from enum import Enum
+
+
+# 定义卡牌属性
+class Attribute(Enum):
+    YIN = "阴"
+    DARK = "暗"
+    LIGHT = "光"
+    BLANK = "空白"
+
+
+# 效果扁平化后的字段
+EFFECT_FIELDS = ('damage_boost', 'heal', 'energy_gain')
+# 卡牌可以使用的效果名；effects.register_effect 注册的新效果也会加进来，存放在卡牌的 extra_effects 里
+EFFECT_NAMES = set(EFFECT_FIELDS)
+
+# 卡牌注册表：下标即卡牌编号
+CARDS = []
+_REGISTRY = {}
+# 新卡注册后依次调用 hook(card)，用于让按卡牌编号索引的预编译表保持完整
+REGISTER_HOOKS = []
+
+
+# 定义卡牌类：同样的定义只创建一次，之后返回同一个不可变对象
+class Card:
+    __slots__ = ('id', 'name', 'attribute', 'value', 'cost') + EFFECT_FIELDS + ('extra_effects',)
+
+    def __new__(cls, name, attribute, value, cost, effects=None):
+        effects = effects or {}
+        unknown = set(effects) - EFFECT_NAMES
+        if unknown:
+            raise ValueError(f"未知的卡牌效果：{', '.join(sorted(unknown))}")
+        extra = tuple(sorted((k, v) for k, v in effects.items() if k not in EFFECT_FIELDS and v))
+        key = (name, attribute, value, cost) + tuple(effects.get(f, 0) for f in EFFECT_FIELDS) + (extra,)
+        card = _REGISTRY.get(key)
+        if card is None:
+            card = object.__new__(cls)
+            fields = ('name', 'attribute', 'value', 'cost') + EFFECT_FIELDS + ('extra_effects',)
+            for field, v in zip(fields, key):
+                object.__setattr__(card, field, v)
+            object.__setattr__(card, 'id', len(CARDS))
+            CARDS.append(card)
+            _REGISTRY[key] = card
+            for hook in REGISTER_HOOKS:
+                hook(card)
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("卡牌是不可变的")
+
+    def __reduce__(self):
+        # 按定义重新注册，跨进程传递后仍是同一张卡
+        return Card, (self.name, self.attribute, self.value, self.cost, self.effects)
+
+    @property
+    def effects(self):
+        effects = {f: getattr(self, f) for f in EFFECT_FIELDS if getattr(self, f)}
+        effects.update(self.extra_effects)
+        return effects
+
+    def __repr__(self):
+        return f"{self.name} ({self.attribute.value})"
+
+
+def card_by_id(card_id):
+    return CARDS[card_id]
+
+
+def deck_ids(deck):
+    """牌组 -> 卡牌编号的 bytes，可哈希、占用小"""
+    return bytes(card.id for card in deck)
+
+
+def deck_from_ids(ids):
+    return [CARDS[i] for i in ids]
+
+
+def deck_key(deck):
+    """与顺序无关的牌组键（排序后的编号），用于缓存"""
+    return bytes(sorted(card.id for card in deck))
+
+
+# 平衡卡牌配置（与 test0.2.2 的 generate_random_deck 相同）
+BALANCED_CARDS = (
+    Card("阴之爪", Attribute.YIN, 8, 3, {'damage_boost': 2}),
+    Card("暗影球", Attribute.DARK, 6, 2, {'heal': 3}),
+    Card("光之矛", Attribute.LIGHT, 7, 4, {'energy_gain': 2}),
+    Card("虚无盾", Attribute.BLANK, 5, 1),
+    Card("阴阳玉", Attribute.YIN, 6, 3, {'damage_boost': 1}),
+    Card("暗夜突袭", Attribute.DARK, 9, 5),
+    Card("圣光治愈", Attribute.LIGHT, 4, 2, {'heal': 5}),
+    Card("空白屏障", Attribute.BLANK, 7, 3),
+    # 新增平衡卡牌
+    Card("暗影步", Attribute.DARK, 5, 2, {'energy_gain': 1}),
+    Card("光明祝福", Attribute.LIGHT, 6, 3, {'heal': 4}),
+    Card("阴云笼罩", Attribute.YIN, 7, 4, {'damage_boost': 3}),
+    Card("虚空吞噬", Attribute.BLANK, 8, 5),
+)
+
+DECK_SIZE = 15
+
+# test0.1 ~ test0.2.1 的卡池（BALANCED_CARDS 的前 8 张）和牌组张数
+BASE_CARDS = BALANCED_CARDS[:8]
+BASE_DECK_SIZE = 10
+
+
+def generate_random_deck(rng=random, cards=BALANCED_CARDS, deck_size=DECK_SIZE):
+    """生成随机牌组：卡池里每种卡两张，随机取 deck_size 张（默认为 test0.2.2 的平衡卡牌）"""
+    return rng.sample(cards * 2, deck_size)
+
+
+def generate_random_deck_ids(rng=random, cards=BALANCED_CARDS, deck_size=DECK_SIZE):
+    """同 generate_random_deck，但直接返回卡牌编号"""
+    return deck_ids(generate_random_deck(rng, cards, deck_size))
@@ -0,0 +1,235 @@
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .batch import MatchStats
+from .cards import BALANCED_CARDS, DECK_SIZE, deck_key, deck_from_ids, generate_random_deck
+from .engine import run_match, PLAYER_WIN, NPC_WIN, MAX_ROUNDS
+from .policies import POLICIES
+from .rng import derive_seed
+
+MAX_COPIES = 2  # 卡池里每种卡两张
+
+
+def tally(stats, match, as_player):
+    """按候选牌组一方的视角计入一局"""
+    stats.matches += 1
+    if match.winner == (PLAYER_WIN if as_player else NPC_WIN):
+        stats.wins += 1
+    elif match.winner == (NPC_WIN if as_player else PLAYER_WIN):
+        stats.losses += 1
+    stats.rounds += match.round
+    stats.rounds_sq += match.round * match.round
+
+
+def evaluate_chunk(key, seed, count, policy="random", opponent="random", max_rounds=MAX_ROUNDS):
+    """
+    候选牌组对参照对手（每局一副随机牌组）打 count 局，两个座位轮流坐，
+    返回候选方视角的 MatchStats。策略按名字创建，便于传给子进程。
+    """
+    deck = deck_from_ids(key)
+    rng = random.Random(seed)
+    stats = MatchStats()
+    for i in range(count):
+        match_seed = rng.getrandbits(64)
+        other = generate_random_deck(rng)
+        if i % 2 == 0:
+            match = run_match(match_seed, POLICIES[policy](), POLICIES[opponent](),
+                              player_deck=deck, npc_deck=other, max_rounds=max_rounds)
+        else:
+            match = run_match(match_seed, POLICIES[opponent](), POLICIES[policy](),
+                              player_deck=other, npc_deck=deck, max_rounds=max_rounds)
+        tally(stats, match, i % 2 == 0)
+    return stats
+
+
+# 牌组的遗传操作，牌组都用 deck_key（排序后的卡牌编号）表示，同一组合只有一个键
+def random_key(rng):
+    return deck_key(generate_random_deck(rng))
+
+
+def crossover(a, b, rng):
+    """从两个父代的卡牌（合起来 30 张）里抽 15 张，每种不超过两张"""
+    pool = list(a) + list(b)
+    rng.shuffle(pool)
+    counts = Counter()
+    child = []
+    for card_id in pool:
+        if counts[card_id] < MAX_COPIES:
+            counts[card_id] += 1
+            child.append(card_id)
+            if len(child) == DECK_SIZE:
+                break
+    return bytes(sorted(child))
+
+
+def mutate(key, rng, swaps=1):
+    """换掉 swaps 张牌：拿出一张，换成张数还没到上限的另一种卡"""
+    cards = list(key)
+    ids = [card.id for card in BALANCED_CARDS]
+    for _ in range(swaps):
+        cards.pop(rng.randrange(len(cards)))
+        counts = Counter(cards)
+        cards.append(rng.choice([i for i in ids if counts[i] < MAX_COPIES]))
+    return bytes(sorted(cards))
+
+
+# 遗传算法组牌：适应度为对参照对手的胜率，按牌组组合缓存，表现好的牌组追加对局后再淘汰
+class DeckBuilder:
+    """
+    每一代先给所有新牌组 base_matches 局，然后逐轮淘汰（successive halving）：
+    留下胜率较高的一半，把它们的对局数翻倍，直到只剩 elite 个或达到 max_matches。
+    缓存以 deck_key 为键（与顺序无关），已经评估过的组合下一代直接复用、
+    只在需要更多样本时追加；每个块的种子由 (牌组, 块号) 派生，结果与进程数无关。
+    """
+
+    def __init__(self, population=24, elite=4, base_matches=200, max_matches=3200, mutation=0.5,
+                 policy="random", opponent="random", master_seed=0, chunk_size=100, max_rounds=MAX_ROUNDS):
+        for name in (policy, opponent):
+            if name not in POLICIES:
+                raise ValueError(f"未知的策略：{name}（可选：{', '.join(POLICIES)}）")
+        self.population = population
+        self.elite = elite
+        self.base_matches = base_matches
+        self.max_matches = max_matches
+        self.mutation = mutation
+        self.policy = policy
+        self.opponent = opponent
+        self.master_seed = master_seed
+        self.chunk_size = chunk_size
+        self.max_rounds = max_rounds
+        self.rng = random.Random(derive_seed(master_seed, "deckbuilder"))
+        self.cache = {}  # deck_key -> MatchStats
+        self.chunks = Counter()  # deck_key -> 已提交的块数（用来派生下一块的种子）
+        self.submitted = Counter()  # deck_key -> 已提交的局数（最后一块可能不满）
+        self.requests = 0
+        self.hits = 0  # 需要的样本数已经在缓存里，不用再跑
+        self.generation = 0
+        self.keys = [random_key(self.rng) for _ in range(population)]
+        self.pool = None
+        self.workers = 1
+
+    def stats(self, key):
+        return self.cache.setdefault(key, MatchStats())
+
+    def tasks(self, keys, matches):
+        """让 keys 中每个牌组至少有 matches 局"""
+        for key in dict.fromkeys(keys):
+            self.requests += 1
+            have = self.submitted[key]
+            if have >= matches:
+                self.hits += 1
+                continue
+            while have < matches:
+                chunk = self.chunks[key]
+                self.chunks[key] += 1
+                count = min(self.chunk_size, matches - have)
+                have += count
+                self.submitted[key] = have
+                yield key, derive_seed(self.master_seed, "deck", key.hex(), chunk), count
+
+    def evaluate(self, keys, matches):
+        args = (self.policy, self.opponent, self.max_rounds)
+        tasks = self.tasks(keys, matches)
+        if self.pool is None:
+            for key, seed, count in tasks:
+                self.stats(key).merge(evaluate_chunk(key, seed, count, *args))
+            return
+        pending = {}
+
+        def submit_next():
+            task = next(tasks, None)
+            if task is None:
+                return False
+            pending[self.pool.submit(evaluate_chunk, *task, *args)] = task[0]
+            return True
+
+        for _ in range(self.workers * 2):
+            if not submit_next():
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                self.stats(pending.pop(future)).merge(future.result())
+                submit_next()
+
+    def rank(self, keys):
+        return sorted(dict.fromkeys(keys), key=lambda k: (-self.cache[k].win_rate, k))
+
+    def race(self, keys):
+        """逐轮淘汰，返回按胜率排好的牌组（前面的样本多）"""
+        matches = self.base_matches
+        self.evaluate(keys, matches)
+        alive = self.rank(keys)
+        eliminated = []
+        while len(alive) > self.elite and matches < self.max_matches:
+            keep = max(self.elite, len(alive) // 2)
+            eliminated = alive[keep:] + eliminated
+            alive = alive[:keep]
+            matches = min(matches * 2, self.max_matches)
+            self.evaluate(alive, matches)
+            alive = self.rank(alive)
+        return alive + eliminated
+
+    def breed(self, ranked):
+        """精英直接保留，其余由排名前一半的牌组交叉、变异产生"""
+        rng = self.rng
+        parents = ranked[:max(2, len(ranked) // 2)]
+        children = list(ranked[:self.elite])
+        seen = set(children)
+        attempts = 0
+        while len(children) < self.population:
+            a, b = rng.sample(parents, 2)
+            child = crossover(a, b, rng)
+            if rng.random() < self.mutation:
+                child = mutate(child, rng)
+            attempts += 1
+            # 重复的组合换一个；实在凑不出新组合时允许重复（评估时走缓存）
+            if child in seen and attempts < self.population * 10:
+                continue
+            seen.add(child)
+            children.append(child)
+        return children
+
+    def run(self, generations=10, workers=None, progress=None):
+        """progress(代数, 本代排名) 在每代评估完成后调用，返回最后一代的排名"""
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        ranked = []
+        try:
+            for _ in range(generations):
+                ranked = self.race(self.keys)
+                self.generation += 1
+                if progress is not None:
+                    progress(self.generation, ranked)
+                self.keys = self.breed(ranked)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+        return ranked
+
+    def best(self, count=5):
+        """样本最多的那批牌组（每代跑满的精英）按胜率 95% 区间下界排序，样本少的不参与，避免偶然偏高"""
+        most = max((s.matches for s in self.cache.values()), default=0)
+        full = [k for k, s in self.cache.items() if s.matches >= most]
+        return sorted(full, key=lambda k: (-self.cache[k].win_rate_interval()[0], k))[:count]
+
+
+def format_deck(key):
+    counts = Counter(deck_from_ids(key))
+    return " ".join(f"{card.name}×{n}" if n > 1 else card.name
+                    for card, n in sorted(counts.items(), key=lambda kv: kv[0].id))
+
+
+def format_best(builder, count=5):
+    lines = ["排名  胜率     95%区间           对局数  牌组"]
+    for i, key in enumerate(builder.best(count), 1):
+        stats = builder.cache[key]
+        lo, hi = stats.win_rate_interval()
+        lines.append(f"{i:>4}  {stats.win_rate:.4f}  [{lo:.4f}, {hi:.4f}]  {stats.matches:>6}  {format_deck(key)}")
+    total = sum(s.matches for s in builder.cache.values())
+    lines.append(f"共 {builder.generation} 代，评估过 {len(builder.cache)} 种组合，共 {total} 局；"
+                 f"适应度请求 {builder.requests} 次，其中 {builder.hits} 次直接命中缓存")
+    return "\n".join(lines)
@@ -0,0 +1,76 @@
+from collections import namedtuple
+
+from .cards import CARDS, EFFECT_NAMES, REGISTER_HOOKS
+
+# 一种卡牌效果：apply(出牌方, 对手, 数值) 在双方伤害结算之后执行；
+# damage_boost 的 apply 为 None：它在编译对战表时已经算进对战数值，结算时不再处理
+Effect = namedtuple("Effect", "name apply")
+
+EFFECTS = {}
+
+
+def register_effect(name, apply):
+    """
+    注册一种效果，之后卡牌定义里就可以使用这个名字。效果只能修改双方的生命值和能量，
+    这样 Match.apply / undo 的撤销记录仍然完整。多进程模拟时，子进程里也要注册同样的效果。
+    """
+    EFFECTS[name] = Effect(name, apply)
+    EFFECT_NAMES.add(name)
+    return EFFECTS[name]
+
+
+def heal(owner, opponent, magnitude):
+    owner.health = min(owner.max_health, owner.health + magnitude)
+
+
+def energy_gain(owner, opponent, magnitude):
+    owner.energy = min(owner.max_energy, owner.energy + magnitude)
+
+
+EFFECTS["damage_boost"] = Effect("damage_boost", None)
+register_effect("heal", heal)
+register_effect("energy_gain", energy_gain)
+
+
+# 卡牌效果编译表：ops[卡牌编号] 为 ((apply, 数值), ...)，结算时顺序执行，不查任何字典
+class EffectTable:
+    """
+    enabled 为启用的效果名，None 表示所有注册过的效果。每张卡在注册时编译一次
+    （通过 cards.REGISTER_HOOKS），ops 始终覆盖所有卡牌，结算时直接按编号取。
+    没有启用任何效果的表里每张卡都是空元组，结算时只多一次空循环。
+    """
+
+    def __init__(self, enabled=None):
+        self.enabled = None if enabled is None else frozenset(enabled)
+        self.ops = []
+        self.sync()
+        REGISTER_HOOKS.append(self.add)
+
+    def compile(self, card):
+        ops = []
+        for name, magnitude in card.effects.items():
+            if self.enabled is not None and name not in self.enabled:
+                continue
+            apply = EFFECTS[name].apply
+            if apply is not None:
+                ops.append((apply, magnitude))
+        return tuple(ops)
+
+    def sync(self):
+        ops = self.ops
+        for card in CARDS[len(ops):]:
+            ops.append(self.compile(card))
+        return self
+
+    def add(self, card):
+        self.sync()
+
+    def run(self, card, owner, opponent):
+        for apply, magnitude in self.ops[card.id]:
+            apply(owner, opponent, magnitude)
+
+
+# test0.2.x 只保留 damage_boost（已在对战表里），heal / energy_gain 不生效
+NO_EFFECTS = EffectTable(())
+# test0.1 的规则：heal 和 energy_gain 在伤害结算后生效（生命和能量不超过上限）
+ALL_EFFECTS = EffectTable()
@@ -0,0 +1,271 @@
+import random
+from bisect import bisect_left
+from collections import namedtuple
+
+from .cards import CARDS, Attribute
+from .engine import random_policy, action_index
+from .ttable import SHARED_TABLE, state_hash
+
+Solution = namedtuple("Solution", "value move")  # value 为玩家的估值（分出胜负时即获胜概率），move 为卡牌编号（None 表示不出）
+
+
+def _remove(cards, card_id):
+    i = cards.index(card_id)
+    return cards[:i] + cards[i + 1:]
+
+
+def _insert(cards, card_id):
+    i = bisect_left(cards, card_id)
+    return cards[:i] + (card_id,) + cards[i:]
+
+
+def _counts(cards):
+    counts = {}
+    for card_id in cards:
+        counts[card_id] = counts.get(card_id, 0) + 1
+    return counts
+
+
+def side_state(side):
+    """(生命值, 能量, 手牌, 牌堆)，手牌和牌堆为排序后的卡牌编号"""
+    return (side.health, side.energy,
+            tuple(sorted(card.id for card in side.hand)),
+            tuple(sorted(card.id for card in side.deck.draw_pile)))
+
+
+def restraint_key(restraint):
+    """克制关系的规范形式：按属性序号排好的 (克制方, 被克制方)，不克制任何属性时为 None"""
+    order = list(Attribute)
+    return tuple(sorted((order.index(a), order.index(b) if b is not None else None) for a, b in restraint.items()))
+
+
+def is_endgame(match, max_health=8):
+    return match.player.health <= max_health and match.npc.health <= max_health
+
+
+# 小残局的有限深度期望极大极小搜索
+class EndgameSolver:
+    """
+    按 Match 的规则（克制减半、damage_boost、NPC无法出牌扣血、跳过时全额伤害）
+    展开双方的出牌和抽牌，往后看 horizon 个回合，求双方都按这个估值出牌时玩家的估值。
+
+    - 完全信息：假设双方都知道对方的手牌。
+    - 抽牌按牌堆组成均匀随机（与 LazyDeck 及整体重洗的分布相同），不使用弃牌堆。
+    - 每个回合玩家先出牌（或跳过），NPC看到后再应对；双方都可以选择不出。
+    - 这不是精确解：打出的牌会放回牌堆、双方也可以一直不出，对局可以无限进行下去，
+      搜不到终局。horizon 个回合内分出胜负的分支取 1 / 0，其余的叶子按生命值差估值（leaf），
+      所以 horizon 不同时结果可能不同，只在 horizon 之内能分出胜负的残局里是精确的。
+      horizon=2 时通常几毫秒，每多一回合耗时约增加两个数量级（horizon=3 要 1 秒以上）。
+    """
+
+    def __init__(self, match, horizon=2, max_states=1000000, table=SHARED_TABLE):
+        self.battle = match.battle
+        self.penalty = match.no_card_penalty
+        self.player_energy = (match.player.energy_per_turn, match.player.max_energy)
+        self.npc_energy = (match.npc.energy_per_turn, match.npc.max_energy)
+        self.max_health = match.player.max_health
+        self.horizon = horizon
+        self.max_states = max_states
+        # 置换表（默认为共用的 SHARED_TABLE）的键里带上规则，规则不同的求解器共用一张表也不会串
+        self.memo = table
+        self.rules = state_hash(self.penalty, self.player_energy, self.npc_energy, self.max_health,
+                                restraint_key(match.MATCHUPS.restraint))
+        # 最后一回合与牌堆无关，单独缓存；可选动作也缓存起来（对战数值直接查 Match 的对战表）
+        self.last_memo = {}
+        self.moves_memo = {}
+
+    def state_of(self, match):
+        return side_state(match.player) + side_state(match.npc)
+
+    def moves(self, energy, hand):
+        key = (energy, hand)
+        moves = self.moves_memo.get(key)
+        if moves is None:
+            moves = self.moves_memo[key] = [None] + sorted({c for c in hand if CARDS[c].cost <= energy})
+        return moves
+
+    @staticmethod
+    def play(energy, hand, pile, card_id):
+        if card_id is None:
+            return energy, hand, pile
+        return energy - CARDS[card_id].cost, _remove(hand, card_id), _insert(pile, card_id)
+
+    def player_value(self, state, depth, alpha=0.0, beta=1.0):
+        """
+        玩家决策节点（回合开始、已抽牌）。alpha/beta 为搜索窗口，
+        置换表里保存 [下界, 上界]，窗口外的结果只是界而不是精确值。
+        """
+        key = state_hash(self.rules, state, depth)
+        lo, hi = self.memo.get(key, (0.0, 1.0))
+        if lo == hi or lo >= beta:
+            return lo
+        if hi <= alpha:
+            return hi
+        a, b = max(alpha, lo), min(beta, hi)
+
+        ph, pe, phand, ppile = state[:4]
+        best = -1.0
+        for move in self.moves(pe, phand):
+            after = (ph,) + self.play(pe, phand, ppile, move) + state[4:]
+            value = self.npc_value(after, move, depth, max(a, best), b)
+            if value > best:
+                best = value
+                if best >= b:
+                    break
+
+        if best <= a:
+            hi = best
+        elif best >= b:
+            lo = best
+        else:
+            lo = hi = best
+        self.memo.put(key, (lo, hi))
+        return best
+
+    def npc_value(self, state, player_move, depth, alpha=0.0, beta=1.0):
+        """NPC决策节点（玩家已出牌或跳过）"""
+        nh, ne, nhand, npile = state[4:]
+        best = 2.0
+        for move in self.moves(ne, nhand):
+            after = state[:4] + (nh,) + self.play(ne, nhand, npile, move)
+            value = self.outcome(after, player_move, move, depth, alpha, min(beta, best))
+            if value < best:
+                best = value
+                if best <= alpha:
+                    break
+        return best
+
+    def settle(self, ph, nh, player_move, npc_move):
+        """与 Match.settle 相同的生命值结算"""
+        npc_card = CARDS[npc_move] if npc_move is not None else None
+        if player_move is None:
+            if npc_card is not None:
+                ph -= npc_card.value
+        elif npc_card is not None:
+            pv, nv = self.battle(CARDS[player_move], npc_card)
+            if pv > nv:
+                nh -= pv - nv
+            elif nv > pv:
+                ph -= nv - pv
+        else:
+            nh -= self.penalty
+        return ph, nh
+
+    def leaf(self, ph, nh):
+        """
+        搜索深度用完、仍未分胜负的局面：0.5 加上按生命值差的修正（同 RolloutPolicy），
+        截在 (0, 1) 之内，不会和分出胜负的分支混淆
+        """
+        return 0.5 + max(-0.49, min(0.49, (ph - nh) / (2 * self.max_health)))
+
+    def outcome(self, state, player_move, npc_move, depth, alpha=0.0, beta=1.0):
+        ph, pe, phand, ppile, nh, ne, nhand, npile = state
+        ph, nh = self.settle(ph, nh, player_move, npc_move)
+        if ph <= 0 or nh <= 0:
+            return 1.0 if nh <= 0 else 0.0
+        if depth <= 1:
+            return self.leaf(ph, nh)
+
+        # 下一回合开始：回复能量，双方各抽一张（机会节点，按 Star1 剪枝）
+        per, cap = self.player_energy
+        pe = min(pe + per, cap)
+        per, cap = self.npc_energy
+        ne = min(ne + per, cap)
+        n_draws = self.draws(nhand, npile)
+        total = 0.0
+        remaining = 1.0
+        for p_prob, p_hand, p_pile in self.draws(phand, ppile):
+            for n_prob, n_hand, n_pile in n_draws:
+                prob = p_prob * n_prob
+                remaining -= prob
+                # 子节点取值必须落在这个窗口内才会影响本节点相对 [alpha, beta] 的结果
+                child_alpha = (alpha - total - remaining) / prob
+                child_beta = (beta - total) / prob
+                if depth == 2:
+                    value = self.last_round(ph, pe, p_hand, nh, ne, n_hand)
+                else:
+                    value = self.player_value((ph, pe, p_hand, p_pile, nh, ne, n_hand, n_pile), depth - 1,
+                                              max(0.0, child_alpha), min(1.0, child_beta))
+                total += prob * value
+                if total + remaining <= alpha or total >= beta:
+                    return total + (remaining if total + remaining <= alpha else 0.0)
+        return total
+
+    def last_round(self, ph, pe, phand, nh, ne, nhand):
+        """只剩最后一回合：结果只取决于双方生命值、能量和手牌"""
+        key = (ph, pe, phand, nh, ne, nhand)
+        best = self.last_memo.get(key)
+        if best is not None:
+            return best
+        best = 0.0
+        npc_moves = self.moves(ne, nhand)
+        for player_move in self.moves(pe, phand):
+            worst = 1.0
+            for npc_move in npc_moves:
+                h1, h2 = self.settle(ph, nh, player_move, npc_move)
+                value = 1.0 if h2 <= 0 else 0.0 if h1 <= 0 else self.leaf(h1, h2)
+                if value < worst:
+                    worst = value
+                    if worst <= 0.0:
+                        break
+            if worst > best:
+                best = worst
+                if best >= 1.0:
+                    break
+        if len(self.last_memo) >= self.max_states:
+            self.last_memo.clear()
+        self.last_memo[key] = best
+        return best
+
+    @staticmethod
+    def draws(hand, pile):
+        if not pile:
+            return [(1.0, hand, pile)]
+        n = len(pile)
+        return [(count / n, _insert(hand, card_id), _remove(pile, card_id))
+                for card_id, count in _counts(pile).items()]
+
+    def solve(self, match):
+        """玩家决策时调用：返回玩家的最佳出牌和估值"""
+        state = self.state_of(match)
+        ph, pe, phand, ppile = state[:4]
+        best = Solution(-1.0, None)
+        for move in self.moves(pe, phand):
+            after = (ph,) + self.play(pe, phand, ppile, move) + state[4:]
+            value = self.npc_value(after, move, self.horizon, max(0.0, best.value), 1.0)
+            if value > best.value:
+                best = Solution(value, move)
+        return best
+
+    def solve_npc(self, match):
+        """NPC决策时调用（match.pending_card 为玩家已出的牌，None 表示玩家跳过）"""
+        state = self.state_of(match)
+        pending = match.pending_card
+        player_move = pending.id if pending is not None else None
+        nh, ne, nhand, npile = state[4:]
+        best = Solution(2.0, None)
+        for move in self.moves(ne, nhand):
+            after = state[:4] + (nh,) + self.play(ne, nhand, npile, move)
+            value = self.outcome(after, player_move, move, self.horizon, 0.0, min(1.0, best.value))
+            if value < best.value:
+                best = Solution(value, move)
+        return best
+
+
+# 残局时按求解器出牌，其余时候交给 fallback 策略；side 为 None 时按 me is match.npc 判断座位
+class EndgamePolicy:
+    def __init__(self, side=None, fallback=random_policy, max_health=8, horizon=2):
+        self.side = side
+        self.fallback = fallback
+        self.max_health = max_health
+        self.horizon = horizon
+        self.solver = None
+
+    def __call__(self, me, opponent, rng=random, match=None):
+        if match is None or not is_endgame(match, self.max_health):
+            return self.fallback(me, opponent, rng, match)
+        if self.solver is None:
+            self.solver = EndgameSolver(match, self.horizon)
+        side = self.side or ("npc" if me is match.npc else "player")
+        solution = self.solver.solve_npc(match) if side == "npc" else self.solver.solve(match)
+        return action_index(me, solution.move)
@@ -0,0 +1,325 @@
+import time
+import tkinter as tk
+
+from .engine import Match, BATTLE, NPC_NO_CARD, NPC_AUTO_PLAY, PLAYER_WIN, NPC_WIN, DRAW, MAX_ROUNDS
+from .resources import ResourceCache
+from .rng import derive_seed
+
+FRAME_MS = 33   # 观战模式的界面刷新间隔，约 30 帧/秒
+TURN_RATE = 5   # 1 倍速时每秒走的回合数，与手动对局 0.2 秒的回合间隔相当
+SPEEDS = (1, 4, 16, 64, None)  # None 为全速
+
+
+# 定义游戏界面（规则全部交给 Match，这里只负责显示和输入）
+class Game:
+    def __init__(self, match=None, recorder=None, instrumentation=None, art_dir=None, scale=1.0):
+        self.match = match or Match()
+        # recorder 为 ReplayWriter 时，对局结束后把种子和出牌序列写入回放文件
+        self.recorder = recorder
+        if recorder is not None:
+            if self.match.seed is None:
+                raise ValueError("录制对局需要以 seed 创建 Match")
+            self.match.moves = bytearray()
+        self.player = self.match.player
+        self.npc = self.match.npc
+
+        self.root = tk.Tk()
+        self.root.title("卡牌游戏")
+        self.turn_delay = 200  # 0.2秒延迟
+        self.npc_delay = 200   # NPC出牌前的延迟，NPC思考的时间计入其中
+
+        # art_dir 为卡图目录时按钮显示卡图（缓存并在回合间隙预加载），否则只显示文字
+        self.resources = ResourceCache(self.root, art_dir, scale) if art_dir is not None else None
+
+        # GUI组件
+        self.status_label = tk.Label(self.root, text="", font=("Arial", 14))
+        self.status_label.pack()
+
+        self.result_label = tk.Label(self.root, text="上回合结果：", font=("Arial", 12))
+        self.result_label.pack()
+
+        self.skip_button = tk.Button(self.root, text="跳过回合", command=self.skip_turn)
+        self.skip_button.pack(pady=5)
+
+        # 手牌按钮池：按钮只创建不销毁，每回合原地更新文字和状态，多出的隐藏
+        self.hand_frame = tk.Frame(self.root)
+        self.hand_frame.pack()
+        self.card_buttons = []
+        self.button_config = []  # 每个按钮上次设置的 (text, state, image)，没变就不再 config
+        self.shown_buttons = 0
+        self.input_enabled = False
+
+        # instrumentation 为 profiling.Instrumentation 时，从第一回合开始记录各阶段耗时
+        if instrumentation is not None:
+            instrumentation.install(self)
+
+        self.update_hand_buttons()
+        self.start_turn()
+        if self.resources is not None:
+            self.resources.preload(self.player.deck.draw_pile)
+
+    def hand_button(self, i):
+        while len(self.card_buttons) <= i:
+            slot = len(self.card_buttons)
+            if self.resources is not None:
+                # 带图片时 width 的单位是像素，交给图片和文字决定按钮大小
+                btn = tk.Button(self.hand_frame, compound=tk.TOP, font=self.resources.font(10),
+                                command=lambda i=slot: self.play_card(i))
+            else:
+                btn = tk.Button(self.hand_frame, width=25, command=lambda i=slot: self.play_card(i))
+            self.card_buttons.append(btn)
+            self.button_config.append(None)
+        return self.card_buttons[i]
+
+    def set_button(self, i, text, state, image=None):
+        # button_config 同时保存着按钮正在显示的 PhotoImage 的引用，缓存淘汰后图片也不会失效
+        config = (text, state, image)
+        if self.button_config[i] != config:
+            if self.resources is not None:
+                self.card_buttons[i].config(text=text, state=state, image=image or "")
+            else:
+                self.card_buttons[i].config(text=text, state=state)
+            self.button_config[i] = config
+
+    def update_hand_buttons(self):
+        hand = self.player.hand
+        energy = self.player.energy
+        resources = self.resources
+        for i, card in enumerate(hand):
+            self.hand_button(i)
+            playable = self.input_enabled and card.cost <= energy
+            self.set_button(i, f"{card.name} (费:{card.cost} 攻:{card.value})",
+                            tk.NORMAL if playable else tk.DISABLED,
+                            resources.image(card) if resources is not None else None)
+
+        # 只有手牌数量变化时才需要重新布局，且只动末尾的按钮
+        for i in range(self.shown_buttons, len(hand)):
+            self.card_buttons[i].pack(pady=2)
+        for i in range(len(hand), self.shown_buttons):
+            self.card_buttons[i].pack_forget()
+        self.shown_buttons = len(hand)
+
+    def play_card(self, index):
+        self.toggle_buttons(False)
+        player_card = self.player.play_card(index)
+        if player_card:
+            self.root.after_idle(lambda: self.npc_turn(player_card))
+        else:
+            self.toggle_buttons(True)
+
+    def npc_turn(self, player_card):
+        start = time.perf_counter()
+        result = self.match.npc_turn(player_card)
+        self.show_npc_result(start, result)
+
+    def skip_turn(self):
+        self.toggle_buttons(False)
+        self.update_result("玩家跳过回合")
+        self.root.after_idle(self.npc_auto_play)
+
+    def npc_auto_play(self):
+        start = time.perf_counter()
+        result = self.match.npc_auto_play()
+        self.show_npc_result(start, result)
+
+    def show_npc_result(self, start, result):
+        """NPC已经决策完毕，等满 npc_delay 后再显示结果"""
+        elapsed = int((time.perf_counter() - start) * 1000)
+        self.root.after(max(0, self.npc_delay - elapsed), lambda: self.show_round(result))
+
+    def show_round(self, result):
+        self.update_result(self.describe(result))
+        self.end_round()
+
+    def end_round(self):
+        if not self.check_game_over():
+            # 回合间隔里预先解码下回合可能用到的卡图：手牌，以及可能抽到的牌堆里的牌
+            if self.resources is not None:
+                self.resources.preload(self.player.hand + self.player.deck.draw_pile)
+            self.root.after(self.turn_delay, self.start_turn)
+
+    def describe(self, result):
+        if result.kind == BATTLE:
+            text = f"玩家出牌：{result.player_card.name}（{result.pv})\nNPC出牌：{result.npc_card.name}（{result.nv})"
+            if result.pv > result.nv:
+                text += "\n🎉 玩家胜出！"
+            elif result.nv > result.pv:
+                text += "\n💀 NPC胜出！"
+            else:
+                text += "\n⚖️ 平局！"
+            return text
+        if result.kind == NPC_NO_CARD:
+            return f"🤖 NPC无法出牌，扣除{self.match.no_card_penalty}点生命值"
+        if result.kind == NPC_AUTO_PLAY:
+            return f"NPC自动出牌：{result.npc_card.name}（{result.nv}伤害）"
+        return "NPC跳过回合"
+
+    def toggle_buttons(self, enable):
+        self.input_enabled = enable
+        self.update_hand_buttons()
+        self.skip_button.config(state=tk.NORMAL if enable else tk.DISABLED)
+
+    def start_turn(self):
+        self.match.start_turn()
+
+        # 一次性刷新所有组件，回合切换只触发一次布局
+        self.input_enabled = True
+        self.update_status()
+        self.update_hand_buttons()
+
+        # 没有可出的牌时只能跳过，保持跳过按钮可用
+        text = "跳过回合（无法出牌）" if not self.player.can_play_any() else "跳过回合"
+        self.skip_button.config(text=text, state=tk.NORMAL)
+
+    def update_status(self):
+        status = f"🏥 玩家：{self.player.health}  🔋 {self.player.energy}/{self.player.max_energy}\n"
+        status += f"🏥 NPC：{self.npc.health}  🔋 {self.npc.energy}/{self.npc.max_energy}"
+        self.status_label.config(text=status)
+
+    def update_result(self, text):
+        self.result_label.config(text=f"上回合结果：\n{text}")
+
+    def check_game_over(self):
+        if self.match.winner is None:
+            return False
+        if self.recorder is not None:
+            self.recorder.write(self.match)
+            self.recorder.flush()
+        winner = "玩家" if self.npc.health <= 0 else "NPC"
+        self.status_label.config(text=f"游戏结束！{winner}获胜！")
+        self.toggle_buttons(False)
+        self.skip_button.config(state=tk.DISABLED)
+        return True
+
+    def start_gui(self):
+        self.root.mainloop()
+
+
+# 观战模式：双方都由策略出牌，规则在帧与帧之间成批推进，界面按固定帧率只显示最新状态
+class Spectator(Game):
+    """
+    player_policy / npc_policy 为策略工厂（如 policies.POLICIES 里的值），每局新建一个实例。
+    每帧按速度倍率累计应走的回合数，全速时则一直走到本帧的时间预算（frame_budget）用完；
+    走完后界面只刷新一次，中间回合的结果直接丢弃。每帧占用的时间有上限，
+    连着跑上千回合时事件循环也照常响应；跟不上倍率时丢掉积压的回合，而不是越积越多。
+    """
+
+    def __init__(self, player_policy, npc_policy, games=1, speed=1, seed=None, max_rounds=MAX_ROUNDS,
+                 art_dir=None, scale=1.0, frame_ms=FRAME_MS):
+        self.player_factory = player_policy
+        self.npc_factory = npc_policy
+        self.games = games
+        self.speed = speed
+        self.seed = seed
+        self.max_rounds = max_rounds
+        self.frame_ms = frame_ms
+        self.frame_budget = frame_ms * 0.6 / 1000  # 留出时间给刷新和事件处理
+        self.paused = False
+        self.finished = False
+        self.dirty = True
+        self.last_result = None
+        self.credit = 0.0  # 按倍率累计、还没走的回合数
+        self.turns = 0
+        self.frames = 0
+        self.played = 0
+        self.scores = {PLAYER_WIN: 0, NPC_WIN: 0, DRAW: 0}
+        super().__init__(self.new_match(), art_dir=art_dir, scale=scale)
+
+        # 观战时没有手动操作：跳过按钮换成速度和暂停控制
+        self.skip_button.pack_forget()
+        self.score_label = tk.Label(self.root, text="", font=("Arial", 12))
+        self.score_label.pack()
+        controls = tk.Frame(self.root)
+        controls.pack(pady=5)
+        self.speed_buttons = {}
+        for value in SPEEDS:
+            btn = tk.Button(controls, text="全速" if value is None else f"{value}×",
+                            command=lambda value=value: self.set_speed(value))
+            btn.pack(side=tk.LEFT)
+            self.speed_buttons[value] = btn
+        self.pause_button = tk.Button(controls, text="暂停", command=self.toggle_pause)
+        self.pause_button.pack(side=tk.LEFT)
+        self.set_speed(speed)
+        self.last_frame = time.perf_counter()
+        self.root.after(self.frame_ms, self.frame)
+
+    def new_match(self):
+        seed = derive_seed(self.seed, "watch", self.played) if self.seed is not None else None
+        self.player_policy = self.player_factory()
+        return Match(npc_policy=self.npc_factory(), seed=seed)
+
+    def start_turn(self):
+        # 界面等下一帧统一刷新
+        self.match.start_turn()
+        self.dirty = True
+
+    def set_speed(self, speed):
+        self.speed = speed
+        self.credit = 0.0
+        for value, btn in self.speed_buttons.items():
+            btn.config(relief=tk.SUNKEN if value == speed else tk.RAISED)
+        self.dirty = True
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+        self.pause_button.config(text="继续" if self.paused else "暂停")
+        self.dirty = True
+
+    def advance(self):
+        """走一个回合，对局结束时计分并开始下一局"""
+        match = self.match
+        choice = self.player_policy(match.player, match.npc, match.player_policy_rng, match)
+        self.last_result = match.step(choice, self.max_rounds)
+        self.turns += 1
+        if match.winner is not None:
+            self.scores[match.winner] += 1
+            self.played += 1
+            if self.played >= self.games:
+                self.finished = True
+            else:
+                self.match = self.new_match()
+                self.player = self.match.player
+                self.npc = self.match.npc
+                self.start_turn()
+        self.dirty = True
+
+    def frame(self):
+        start = time.perf_counter()
+        if not self.paused and not self.finished:
+            deadline = start + self.frame_budget
+            if self.speed is None:
+                while not self.finished:
+                    self.advance()
+                    if time.perf_counter() >= deadline:
+                        break
+            else:
+                self.credit += (start - self.last_frame) * TURN_RATE * self.speed
+                while self.credit >= 1 and not self.finished:
+                    self.credit -= 1
+                    self.advance()
+                    if time.perf_counter() >= deadline:
+                        self.credit = 0.0
+                        break
+        self.last_frame = start
+        if self.dirty:
+            self.render()
+        self.frames += 1
+        if not self.finished:
+            elapsed = int((time.perf_counter() - start) * 1000)
+            self.root.after(max(1, self.frame_ms - elapsed), self.frame)
+
+    def render(self):
+        self.dirty = False
+        if self.finished:
+            self.status_label.config(text="观战结束")
+        else:
+            self.update_status()
+        if self.last_result is not None:
+            self.update_result(self.describe(self.last_result))
+        self.update_hand_buttons()
+        speed = "全速" if self.speed is None else f"{self.speed}×"
+        current = min(self.played + 1, self.games)
+        self.score_label.config(text=f"第 {current}/{self.games} 局 第 {self.match.round} 回合  "
+                                     f"玩家胜 {self.scores[PLAYER_WIN]}  NPC胜 {self.scores[NPC_WIN]}  "
+                                     f"平局 {self.scores[DRAW]}\n速度 {speed}{'（已暂停）' if self.paused else ''}  "
+                                     f"共 {self.turns} 回合")
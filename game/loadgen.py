@@ -0,0 +1,114 @@
+import asyncio
+import random
+import resource
+import time
+
+from .server import MatchServer
+
+
+def raise_fd_limit(needed):
+    """尽量把可打开的文件数调到 needed（不超过硬上限），返回调整后的软上限"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        soft = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    return soft
+
+
+# 模拟客户端：每回合随机出一张费用足够的牌，没有就跳过，打完 matches 局后断开
+async def client(host, port, rng, matches, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await reader.readline()  # HELLO
+        state = (await reader.readline()).decode().split()
+        played = 0
+        while True:
+            energy = int(state[3])
+            hand = [] if state[6] == "-" else [int(c.split(":")[1]) for c in state[6].split(",")]
+            playable = [i for i, cost in enumerate(hand) if cost <= energy]
+            command = f"PLAY {rng.choice(playable)}" if playable else "SKIP"
+            start = time.perf_counter()
+            writer.write(f"{command}\n".encode())
+            await writer.drain()
+            line = (await reader.readline()).decode()
+            if not line.startswith("RESULT"):
+                raise RuntimeError(f"意外的回复：{line.strip()}")
+            line = (await reader.readline()).decode()
+            latencies.append(time.perf_counter() - start)
+            if line.startswith("OVER"):
+                played += 1
+                if played >= matches:
+                    break
+                writer.write(b"NEW\n")
+                await writer.drain()
+                line = (await reader.readline()).decode()
+            state = line.split()
+        writer.write(b"QUIT\n")
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def run_load(clients=10000, matches=1, host="127.0.0.1", port=None, concurrency=None, seed=0):
+    """
+    启动 clients 个模拟客户端，最多 concurrency 个同时在线（None 为全部同时连接）。
+    port 为 None 时在同一个事件循环里启动一个本地服务器。返回统计信息。
+    """
+    server = None
+    if port is None:
+        server = MatchServer()
+        await server.start(host, 0)
+        port = server.port
+    # 本地服务器时每个连接在同一进程里占两个文件描述符，同时在线数受上限约束
+    per_client = 2 if server else 1
+    concurrency = concurrency or clients
+    limit = raise_fd_limit(concurrency * per_client + 64)
+    concurrency = max(1, min(concurrency, (limit - 64) // per_client))
+
+    rng = random.Random(seed)
+    latencies = []
+    errors = []
+    semaphore = asyncio.Semaphore(concurrency)
+    peak = 0
+    online = 0
+
+    async def one(i):
+        nonlocal peak, online
+        async with semaphore:
+            online += 1
+            peak = max(peak, online)
+            try:
+                await client(host, port, random.Random(rng.getrandbits(64)), matches, latencies)
+            except (OSError, RuntimeError) as e:
+                errors.append(e)
+            finally:
+                online -= 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        await server.close()
+
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "clients": clients,
+        "peak_online": peak,
+        "errors": len(errors),
+        "turns": n,
+        "elapsed": elapsed,
+        "turns_per_sec": n / elapsed if elapsed else 0.0,
+        "p50_ms": latencies[n // 2] * 1000 if n else 0.0,
+        "p99_ms": latencies[int(n * 0.99)] * 1000 if n else 0.0,
+        "first_error": repr(errors[0]) if errors else None,
+    }
+
+
+def format_load(stats):
+    text = (f"客户端：{stats['clients']}（同时在线峰值 {stats['peak_online']}）  错误：{stats['errors']}\n"
+            f"回合：{stats['turns']}  耗时：{stats['elapsed']:.2f}s  ({stats['turns_per_sec']:.0f} 回合/秒)\n"
+            f"回合延迟 p50：{stats['p50_ms']:.1f}ms  p99：{stats['p99_ms']:.1f}ms")
+    if stats["first_error"]:
+        text += f"\n第一个错误：{stats['first_error']}"
+    return text
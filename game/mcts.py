@@ -0,0 +1,142 @@
+import math
+import random
+import time
+
+from .engine import random_policy, legal_actions, action_index, NPC_WIN, PLAYER_WIN, MAX_ROUNDS
+
+
+# 搜索树节点，子节点以卡牌编号为键（None 表示不出牌）
+class Node:
+    __slots__ = ('children', 'visits', 'wins', 'avail')
+
+    def __init__(self):
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+        self.avail = 1  # 该动作可选的次数（不同的确定化下可选动作不同）
+
+
+# 蒙特卡洛树搜索NPC：对玩家的手牌和牌堆顺序做确定化采样，树只记录NPC的出牌序列
+class MCTSNPC:
+    def __init__(self, budget_ms=150, iterations=None, exploration=0.7,
+                 opponent_policy=random_policy, max_depth=MAX_ROUNDS, seed=None, reuse_tree=True):
+        self.budget_ms = budget_ms
+        self.iterations = iterations
+        self.exploration = exploration
+        self.opponent_policy = opponent_policy
+        self.max_depth = max_depth
+        self.rng = random.Random(seed)
+        self.reuse_tree = reuse_tree
+        self.root = None
+        self.last = None  # (对局, 回合, 动作)，用于下回合复用子树
+        self.last_iterations = 0
+
+    def __call__(self, me, opponent, rng=random, match=None):
+        if match is None:
+            return random_policy(me, opponent, rng)
+        legal = legal_actions(me)
+        root = self.reuse_root(match)
+        if len(legal) > 1:
+            self.search(root, match)
+            action = max(legal, key=lambda a: root.children[a].visits if a in root.children else -1)
+        else:
+            action = legal[0]
+        self.root = root
+        self.last = (match, match.round, action)
+        return action_index(me, action)
+
+    def reuse_root(self, match):
+        if self.reuse_tree and self.last is not None:
+            last_match, last_round, action = self.last
+            if last_match is match and last_round == match.round - 1:
+                child = self.root.children.get(action)
+                if child is not None:
+                    return child
+        return Node()
+
+    def search(self, root, match):
+        iterations = self.iterations
+        deadline = None
+        if self.budget_ms is not None:
+            deadline = time.perf_counter() + self.budget_ms / 1000
+        n = 0
+        while iterations is None or n < iterations:
+            # 每 16 次检查一次时间，减少计时开销
+            if deadline is not None and n & 15 == 0 and time.perf_counter() >= deadline:
+                break
+            self.iterate(root, match)
+            n += 1
+        self.last_iterations = n
+
+    def determinize(self, world):
+        """NPC看不到玩家的手牌和任何一方的牌堆顺序，随机重新发牌"""
+        player = world.player
+        unknown = player.hand + player.deck.draw_pile
+        self.rng.shuffle(unknown)
+        k = len(player.hand)
+        player.hand = unknown[:k]
+        player.deck.draw_pile = unknown[k:]
+        self.rng.shuffle(world.npc.deck.draw_pile)
+
+    def select(self, node, legal):
+        for a in legal:
+            child = node.children.get(a)
+            if child is not None:
+                child.avail += 1
+        unexplored = [a for a in legal if a not in node.children]
+        if unexplored:
+            action = self.rng.choice(unexplored)
+            child = node.children[action] = Node()
+            return action, child, True
+        c = self.exploration
+        best, best_score = None, -1.0
+        for a in legal:
+            child = node.children[a]
+            score = child.wins / child.visits + c * math.sqrt(math.log(child.avail) / child.visits)
+            if score > best_score:
+                best, best_score = a, score
+        return best, node.children[best], False
+
+    def iterate(self, root, match):
+        rng = self.rng
+        world = match.clone(rng)
+        self.determinize(world)
+        pending = world.pending_card
+        node = root
+        path = [root]
+        in_tree = True
+        depth = 0
+        while True:
+            npc = world.npc
+            legal = legal_actions(npc)
+            if in_tree:
+                action, node, expanded = self.select(node, legal)
+                path.append(node)
+                in_tree = not expanded
+            else:
+                action = legal[0] if len(legal) == 1 else rng.choice(legal)
+            index = action_index(npc, action)
+            if pending is None:
+                world.auto_play(index)
+            else:
+                world.resolve(pending, index)
+            depth += 1
+            if world.winner is not None or depth >= self.max_depth:
+                break
+            world.start_turn()
+            choice = self.opponent_policy(world.player, npc, rng, world)
+            pending = world.player.play_card(choice) if choice is not None else None
+
+        reward = self.reward(world)
+        for n in path:
+            n.visits += 1
+            n.wins += reward
+
+    def reward(self, world):
+        if world.winner == NPC_WIN:
+            return 1.0
+        if world.winner == PLAYER_WIN:
+            return 0.0
+        # 未分胜负时按生命值差估计
+        diff = world.npc.health - world.player.health
+        return 0.5 + max(-0.5, min(0.5, diff / (2 * world.npc.max_health)))
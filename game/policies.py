@@ -0,0 +1,133 @@
+import random
+
+from .belief import BeliefPolicy
+from .cards import BALANCED_CARDS
+from .endgame import EndgamePolicy
+from .engine import random_policy, legal_actions, action_index, PLAYER_WIN, DRAW
+
+# 这里的策略都能坐玩家或NPC任一方（me is match.npc 时为NPC），可以互相对战
+
+
+def affordable(me):
+    energy = me.energy
+    return [i for i, card in enumerate(me.hand) if card.cost <= energy]
+
+
+def greedy_policy(me, opponent, rng=random, match=None):
+    """出攻击力最高的牌，攻击力相同时出费用低的"""
+    choices = affordable(me)
+    if not choices:
+        return None
+    return max(choices, key=lambda i: (me.hand[i].value, -me.hand[i].cost))
+
+
+def restraint_policy(me, opponent, rng=random, match=None):
+    """
+    考虑属性克制和 damage_boost 的出牌：NPC应对时已知玩家的牌，直接取伤害差最大的；
+    玩家先出牌时按卡池（BALANCED_CARDS）里所有可能的应对取平均伤害差。
+    """
+    if match is None:
+        return greedy_policy(me, opponent, rng)
+    choices = affordable(me)
+    if not choices:
+        return None
+    if me is match.npc:
+        pending = match.pending_card
+        if pending is None:
+            # 玩家跳过时NPC的牌全额造成伤害
+            return greedy_policy(me, opponent, rng)
+
+        deltas = match.MATCHUPS.delta_row(pending)
+
+        def score(i):
+            return -deltas[me.hand[i].id], -me.hand[i].cost
+        best = max(choices, key=score)
+        # 出牌会吃亏时，不出牌要扣 no_card_penalty，两者取损失小的
+        return best if score(best)[0] > -match.no_card_penalty else None
+
+    def expected(i):
+        card = me.hand[i]
+        deltas = match.MATCHUPS.delta_row(card)
+        return sum(deltas[other.id] for other in BALANCED_CARDS) / len(BALANCED_CARDS), -card.cost
+    return max(choices, key=expected)
+
+
+# 蒙特卡洛式策略：对每个可选动作做若干次随机模拟，取平均结果最好的动作
+class RolloutPolicy:
+    """
+    每次模拟前把对手的手牌和牌堆重新随机分配（看不到的信息不作弊），之后双方都按
+    random_policy 走到分出胜负或 horizon 个回合，未分胜负时按生命值差估值。
+    与 MCTSNPC 不同，它不区分座位，玩家和NPC都可以用。
+    seed 为 None 时，第一次决策从对局传进来的策略随机数流取种子，结果由对局种子决定。
+    """
+
+    def __init__(self, rollouts=8, horizon=8, seed=None):
+        self.rollouts = rollouts
+        self.horizon = horizon
+        self.rng = random.Random(seed) if seed is not None else None
+
+    def __call__(self, me, opponent, rng=random, match=None):
+        if match is None:
+            return random_policy(me, opponent, rng)
+        if self.rng is None:
+            self.rng = random.Random(rng.getrandbits(64))
+        legal = legal_actions(me)
+        if len(legal) == 1:
+            return action_index(me, legal[0])
+        is_npc = me is match.npc
+        best, best_value = None, -1.0
+        for action in legal:
+            value = sum(self.rollout(match, action, is_npc) for _ in range(self.rollouts))
+            if value > best_value:
+                best, best_value = action, value
+        return action_index(me, best)
+
+    def determinize(self, world, is_npc):
+        other = world.player if is_npc else world.npc
+        unknown = other.hand + other.deck.draw_pile
+        self.rng.shuffle(unknown)
+        k = len(other.hand)
+        other.hand = unknown[:k]
+        other.deck.draw_pile = unknown[k:]
+
+    def rollout(self, match, action, is_npc):
+        rng = self.rng
+        world = match.clone(rng)
+        world.npc_policy = random_policy
+        self.determinize(world, is_npc)
+        if is_npc:
+            index = action_index(world.npc, action)
+            if world.pending_card is None:
+                world.auto_play(index)
+            else:
+                world.resolve(world.pending_card, index)
+            if world.winner is None:
+                world.start_turn()
+        else:
+            world.step(action_index(world.player, action))
+        end = match.round + self.horizon
+        while world.winner is None and world.round < end:
+            world.step(random_policy(world.player, world.npc, rng, world))
+        return self.value(world, is_npc)
+
+    @staticmethod
+    def value(world, is_npc):
+        if world.winner is None or world.winner == DRAW:
+            diff = world.player.health - world.npc.health
+            v = 0.5 + max(-0.5, min(0.5, diff / (2 * world.player.max_health)))
+        else:
+            v = 1.0 if world.winner == PLAYER_WIN else 0.0
+        return 1.0 - v if is_npc else v
+
+
+# 名字 -> 工厂函数（每局新建一个，带状态的策略不会跨局共享）
+POLICIES = {
+    "random": lambda: random_policy,
+    "greedy": lambda: greedy_policy,
+    "restraint": lambda: restraint_policy,
+    "rollout": lambda: RolloutPolicy(),
+    # 双方生命值都不超过 8 时用残局搜索（完全信息，能看到对手的手牌），其余时候同 restraint
+    "endgame": lambda: EndgamePolicy(fallback=restraint_policy),
+    # 先手时按对手手牌的信念（belief.Belief）估计应对，后手时同 restraint
+    "belief": lambda: BeliefPolicy(fallback=restraint_policy),
+}
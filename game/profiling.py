@@ -0,0 +1,204 @@
+import cProfile
+import json
+import sys
+from collections import defaultdict
+from time import perf_counter_ns
+
+# 界面刷新的阶段，其余都是规则计算
+UI_PHASES = ("update_hand_buttons", "update_status")
+
+
+# 计数的随机数生成器代理：转发所有方法调用并计数
+class CountingRNG:
+    def __init__(self, rng, counter):
+        self._rng = rng
+        self._counter = counter
+        self._methods = {}
+
+    def __getattr__(self, name):
+        method = self._methods.get(name)
+        if method is None:
+            target = getattr(self._rng, name)
+            if not callable(target):
+                return target
+            counter = self._counter
+
+            def method(*args, **kwargs):
+                counter[0] += 1
+                return target(*args, **kwargs)
+            self._methods[name] = method
+        return method
+
+
+# 每阶段耗时、每回合内存块净增量和随机数调用计数
+class Instrumentation:
+    """
+    install(target) 把计时包装挂到 Game 或 Match 的实例属性上（不改类），
+    uninstall() 原样摘掉。没有安装时规则和界面代码里没有任何额外开销。
+    profile=True 时同时开启 cProfile，可以用 dump_pstats 导出。
+    """
+
+    def __init__(self, profile=False):
+        self.events = []  # (阶段, 分类, 开始 ns, 结束 ns)，用于 Chrome trace
+        self.totals = defaultdict(int)
+        self.counts = defaultdict(int)
+        self.turns = []  # 每回合：{"round", "phases", "net_blocks", "rng_calls"}
+        # net_blocks 是回合前后 sys.getallocatedblocks() 之差：分配减释放，不是分配次数
+        self.rng_calls = [0]
+        self.patched = []
+        self.rngs = []
+        self.profiler = cProfile.Profile() if profile else None
+        self.profiling = False
+        self.origin = perf_counter_ns()
+        self.turn = None
+        self.turn_blocks = 0
+        self.turn_rng = 0
+
+    # 安装 / 卸载
+    def install(self, target):
+        game = target if hasattr(target, "match") else None
+        match = game.match if game is not None else target
+        self.hook(match, "start_turn", "start_turn", "rules", turn_boundary=match)
+        self.hook(match, "npc_turn", "npc_turn", "rules")
+        self.hook(match, "npc_auto_play", "npc_auto_play", "rules")
+        self.hook(match, "npc_choose", "choose_card", "rules")
+        self.hook(match, "battle", "battle", "rules")
+        for side in (match.player, match.npc):
+            self.hook(side, "draw_card", "draw_card", "rules")
+            self.count_rng(side.deck, "rng")
+        for attr in ("rng", "policy_rng", "player_policy_rng"):
+            self.count_rng(match, attr)
+        if game is not None:
+            self.hook(game, "start_turn", "Game.start_turn", "ui")
+            self.hook(game, "update_hand_buttons", "update_hand_buttons", "ui")
+            self.hook(game, "update_status", "update_status", "ui")
+        if self.profiler is not None and not self.profiling:
+            self.profiler.enable()
+            self.profiling = True
+        return self
+
+    def uninstall(self):
+        if self.profiling:
+            self.profiler.disable()
+            self.profiling = False
+        self.close_turn()
+        for obj, attr, had, old in reversed(self.patched):
+            if had:
+                obj.__dict__[attr] = old
+            else:
+                del obj.__dict__[attr]
+            hooks = obj.__dict__.get("_hooks")
+            if hooks is not None:
+                hooks.discard(attr)
+                if not hooks:
+                    del obj.__dict__["_hooks"]
+        for obj, attr, old in reversed(self.rngs):
+            setattr(obj, attr, old)
+        self.patched.clear()
+        self.rngs.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    def hook(self, obj, attr, name, category, turn_boundary=None):
+        had = attr in obj.__dict__
+        old = obj.__dict__.get(attr)
+        func = getattr(obj, attr)
+        record = self.record
+
+        if turn_boundary is not None:
+            match = turn_boundary
+
+            def timed(*args, **kwargs):
+                self.open_turn(match.round + 1)
+                start = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    record(name, category, start, perf_counter_ns())
+        else:
+            def timed(*args, **kwargs):
+                start = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    record(name, category, start, perf_counter_ns())
+
+        obj.__dict__[attr] = timed
+        # clone() 复制实例字典时按 _hooks 去掉这些包装，避免副本调用到原对象的方法
+        obj.__dict__.setdefault("_hooks", set()).add(attr)
+        self.patched.append((obj, attr, had, old))
+
+    def count_rng(self, obj, attr):
+        rng = getattr(obj, attr)
+        if isinstance(rng, CountingRNG):
+            return
+        self.rngs.append((obj, attr, rng))
+        setattr(obj, attr, CountingRNG(rng, self.rng_calls))
+
+    # 记录
+    def record(self, name, category, start, end):
+        self.events.append((name, category, start, end))
+        self.totals[name] += end - start
+        self.counts[name] += 1
+        if self.turn is not None:
+            self.turn["phases"][name] = self.turn["phases"].get(name, 0) + end - start
+
+    def open_turn(self, round):
+        self.close_turn()
+        self.turn = {"round": round, "phases": {}}
+        self.turn_blocks = sys.getallocatedblocks()
+        self.turn_rng = self.rng_calls[0]
+
+    def close_turn(self):
+        turn = self.turn
+        if turn is None:
+            return
+        turn["net_blocks"] = sys.getallocatedblocks() - self.turn_blocks
+        turn["rng_calls"] = self.rng_calls[0] - self.turn_rng
+        self.turns.append(turn)
+        self.turn = None
+
+    # 汇总与导出
+    def summary(self):
+        """按阶段汇总：{阶段: (调用次数, 总毫秒, 平均微秒, 最大微秒)}"""
+        longest = defaultdict(int)
+        for name, _, start, end in self.events:
+            longest[name] = max(longest[name], end - start)
+        return {name: (self.counts[name], total / 1e6, total / self.counts[name] / 1e3, longest[name] / 1e3)
+                for name, total in self.totals.items()}
+
+    def report(self):
+        lines = [f"{'阶段':<22}{'次数':>8}{'总计(ms)':>12}{'平均(µs)':>12}{'最大(µs)':>12}"]
+        for name, (count, total, mean, longest) in sorted(self.summary().items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{name:<22}{count:>8}{total:>12.2f}{mean:>12.1f}{longest:>12.1f}")
+        ui = sum(self.totals[name] for name in UI_PHASES) / 1e6
+        rules = sum(self.totals[name] for name in ("start_turn", "npc_turn", "npc_auto_play")) / 1e6
+        lines.append(f"界面刷新共 {ui:.2f}ms，规则（开始回合 + NPC回合）共 {rules:.2f}ms")
+        if self.turns:
+            n = len(self.turns)
+            lines.append(f"回合数：{n}  每回合平均内存块净增量：{sum(t['net_blocks'] for t in self.turns) / n:.1f}  "
+                         f"随机数调用：{sum(t['rng_calls'] for t in self.turns) / n:.1f}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Chrome trace（chrome://tracing、Perfetto）的事件列表，界面和规则分两条线"""
+        tids = {"ui": 1, "rules": 2}
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": category}}
+                  for category, tid in tids.items()]
+        for name, category, start, end in self.events:
+            events.append({"name": name, "cat": category, "ph": "X", "pid": 1, "tid": tids[category],
+                           "ts": (start - self.origin) / 1e3, "dur": (end - start) / 1e3})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def dump_pstats(self, path):
+        if self.profiler is None:
+            raise ValueError("需要以 Instrumentation(profile=True) 创建才能导出 pstats")
+        self.profiler.dump_stats(path)
@@ -0,0 +1,233 @@
+import mmap
+import os
+import random
+import struct
+from collections import namedtuple
+
+from .cards import CARDS, deck_ids, deck_from_ids
+from .effects import NO_EFFECTS
+from .engine import Deck, InsertDeck, LazyDeck, Match, SKIP, DRAW, run_match
+from .rng import derive_seed
+
+# 回放文件格式（小端）
+#
+#   数据文件：MAGIC 头 + 若干条记录，每条为 u32 长度 + 内容，只追加不修改
+#   记录内容：u64 种子 | u8 牌堆类型 | u8 随机数生成器类型 | i8 结果 | u16 回合数 | i16 玩家生命 | i16 NPC生命
+#             | u8 玩家牌组长度 | u8 NPC牌组长度 | 两副牌组的卡牌编号 | 每回合 4 字节出牌
+#   索引文件（数据文件名 + ".idx"）：INDEX_MAGIC 头 + 每条记录一个 u64 偏移
+#
+# 牌组长度为 0 表示牌组由种子随机生成；出牌为玩家和NPC各自的 (卡牌编号, 手牌下标)，
+# SKIP 表示跳过/不出。手牌里有同名牌时下标决定打出哪一张，回放后的手牌顺序才能完全一致。
+# 卡牌编号对应导入时注册的 CARDS，所以只能回放用已注册卡牌打的对局。
+MAGIC = b"CGRP\x02\x00\x00\x00"
+INDEX_MAGIC = b"CGRI\x02\x00\x00\x00"
+LENGTH = struct.Struct("<I")
+HEADER = struct.Struct("<QBBbHhhBB")
+OFFSET = struct.Struct("<Q")
+UNFINISHED = -128  # 对局未结束（例如界面中途关闭）
+
+DECK_CLASSES = (Deck, InsertDeck, LazyDeck)
+RNG_CLASSES = (random.Random,)  # 头部仍保留生成器编号这个字节
+
+ReplayRecord = namedtuple("ReplayRecord", "seed deck_class rng_class winner rounds player_health npc_health "
+                                          "player_deck npc_deck moves")
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+def encode(match):
+    """把一局对局（需要以 seed 创建并开启录制）编码为记录内容"""
+    if match.seed is None or match.moves is None:
+        raise ValueError("只能保存以种子创建并开启录制的对局")
+    if len(CARDS) > SKIP:
+        raise ValueError("卡牌编号超出单字节范围，无法录制")
+    if match.EFFECTS is not NO_EFFECTS:
+        raise ValueError("回放格式只记录 test0.2.2 的规则，带卡牌效果的对局无法录制")
+    if (match.no_card_penalty, match.deck_cards, match.deck_size) != \
+            (Match.no_card_penalty, Match.deck_cards, Match.deck_size):
+        raise ValueError("回放格式只记录 test0.2.2 的规则，其他版本的对局无法录制")
+    player_deck, npc_deck = (deck_ids(deck) if deck is not None else b"" for deck in match.given_decks)
+    winner = match.winner if match.winner is not None else UNFINISHED
+    header = HEADER.pack(match.seed, DECK_CLASSES.index(match.deck_class), RNG_CLASSES.index(match.rng_class),
+                         winner, match.round, match.player.health, match.npc.health,
+                         len(player_deck), len(npc_deck))
+    return b"".join((header, player_deck, npc_deck, match.moves))
+
+
+def decode(payload):
+    seed, deck_class, rng_class, winner, rounds, ph, nh, pn, nn = HEADER.unpack_from(payload)
+    start = HEADER.size
+    player_deck = bytes(payload[start:start + pn]) or None
+    npc_deck = bytes(payload[start + pn:start + pn + nn]) or None
+    moves = bytes(payload[start + pn + nn:])
+    return ReplayRecord(seed, DECK_CLASSES[deck_class], RNG_CLASSES[rng_class], winner if winner != UNFINISHED else None,
+                        rounds, ph, nh, player_deck, npc_deck, moves)
+
+
+def rebuild_index(path):
+    """按长度前缀扫描数据文件重写索引，丢弃末尾不完整的记录，返回记录数"""
+    size = os.path.getsize(path)
+    offsets = []
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"不是回放文件：{path}")
+        pos = len(MAGIC)
+        while pos + LENGTH.size <= size:
+            (length,) = LENGTH.unpack(f.read(LENGTH.size))
+            if pos + LENGTH.size + length > size:
+                break
+            offsets.append(pos)
+            pos += LENGTH.size + length
+            f.seek(pos)
+    if pos < size:
+        os.truncate(path, pos)
+    with open(index_path(path), "wb") as f:
+        f.write(INDEX_MAGIC)
+        f.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+    return len(offsets)
+
+
+# 只追加的回放写入器：先写数据再写索引，两者不一致时（写到一半中断）打开时重建索引
+class ReplayWriter:
+    def __init__(self, path):
+        self.path = path
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as f:
+                f.write(MAGIC)
+            with open(index_path(path), "wb") as f:
+                f.write(INDEX_MAGIC)
+        elif not self.index_consistent():
+            rebuild_index(path)
+        self.data = open(path, "ab")
+        self.index = open(index_path(path), "ab")
+        self.offset = self.data.tell()
+
+    def index_consistent(self):
+        try:
+            size = os.path.getsize(index_path(self.path))
+        except OSError:
+            return False
+        count = (size - len(INDEX_MAGIC)) // OFFSET.size
+        if size < len(INDEX_MAGIC) or (size - len(INDEX_MAGIC)) % OFFSET.size:
+            return False
+        if count == 0:
+            return os.path.getsize(self.path) == len(MAGIC)
+        with open(index_path(self.path), "rb") as f:
+            f.seek(size - OFFSET.size)
+            (last,) = OFFSET.unpack(f.read(OFFSET.size))
+        with open(self.path, "rb") as f:
+            f.seek(last)
+            (length,) = LENGTH.unpack(f.read(LENGTH.size))
+        return last + LENGTH.size + length == os.path.getsize(self.path)
+
+    def write(self, match):
+        payload = encode(match)
+        self.data.write(LENGTH.pack(len(payload)))
+        self.data.write(payload)
+        self.index.write(OFFSET.pack(self.offset))
+        self.offset += LENGTH.size + len(payload)
+
+    def flush(self):
+        self.data.flush()
+        self.index.flush()
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 随机访问读取器：数据和索引都用 mmap 映射，第 n 局直接按索引定位
+class ReplayReader:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(index_path(path), "rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(MAGIC)] != MAGIC or self.index[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"不是回放文件：{path}")
+        self.count = (len(self.index) - len(INDEX_MAGIC)) // OFFSET.size
+
+    def __len__(self):
+        return self.count
+
+    def payload(self, n):
+        if not -self.count <= n < self.count:
+            raise IndexError(f"没有第 {n} 局")
+        n %= self.count
+        (offset,) = OFFSET.unpack_from(self.index, len(INDEX_MAGIC) + n * OFFSET.size)
+        (length,) = LENGTH.unpack_from(self.data, offset)
+        start = offset + LENGTH.size
+        return memoryview(self.data)[start:start + length]
+
+    def __getitem__(self, n):
+        with self.payload(n) as payload:
+            return decode(payload)
+
+    def __iter__(self):
+        for n in range(self.count):
+            yield self[n]
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def check_move(side, card_id, index, round):
+    if index >= len(side.hand) or side.hand[index].id != card_id:
+        raise ValueError(f"第 {round} 回合{side.name}的第 {index} 张手牌不是编号 {card_id} 的卡牌")
+
+
+def replay(record, verify=True):
+    """按记录的种子和出牌序列重新跑一遍规则引擎，返回结束时的 Match"""
+    player_deck = deck_from_ids(record.player_deck) if record.player_deck else None
+    npc_deck = deck_from_ids(record.npc_deck) if record.npc_deck else None
+    match = Match(player_deck, npc_deck, deck_class=record.deck_class, seed=record.seed,
+                  rng_class=record.rng_class)
+    match.start_turn()
+    moves = record.moves
+    for i in range(0, len(moves), 4):
+        player_move, player_index, npc_move, npc_index = moves[i:i + 4]
+        if npc_move == SKIP:
+            npc_index = None
+        else:
+            check_move(match.npc, npc_move, npc_index, match.round)
+        if player_move == SKIP:
+            match.pending_card = None
+            match.auto_play(npc_index)
+        else:
+            check_move(match.player, player_move, player_index, match.round)
+            player_card = match.player.play_card(player_index)
+            if player_card is None:
+                raise ValueError(f"第 {match.round} 回合{match.player.name}无法打出编号 {player_move} 的卡牌")
+            match.pending_card = player_card
+            match.resolve(player_card, npc_index)
+        if match.winner is None and i + 4 < len(moves):
+            match.start_turn()
+    if record.winner == DRAW and match.winner is None:
+        match.winner = DRAW
+    if verify and (match.winner, match.round, match.player.health, match.npc.health) != \
+            (record.winner, record.rounds, record.player_health, record.npc_health):
+        raise ValueError("回放结果与记录不一致")
+    return match
+
+
+def record_matches(path, count, master_seed=0, **kwargs):
+    """模拟 count 局并追加到回放文件，kwargs 传给 run_match"""
+    with ReplayWriter(path) as writer:
+        for i in range(count):
+            writer.write(run_match(derive_seed(master_seed, "replay", i), record=True, **kwargs))
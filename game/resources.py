@@ -0,0 +1,120 @@
+import os
+import tkinter as tk
+import tkinter.font as tkfont
+from collections import OrderedDict
+from fractions import Fraction
+
+from .cards import CARDS
+
+ART_EXTENSIONS = (".png", ".gif", ".ppm")
+ENTRY_OVERHEAD = 256  # 没有卡图的条目也按这么多字节计，避免缓存条目无限增长
+
+# 卡图和字体的缓存：每张卡在每个缩放比例下只解码一次，卡图按占用字节数 LRU 淘汰，字体不淘汰
+class ResourceCache:
+    """
+    卡图放在 art_dir 下，文件名为卡牌名加扩展名（如 阴之爪.png），没有图的卡返回 None，
+    界面退回纯文字。缓存键为 (卡牌编号, 缩放比例)，占用按 宽 × 高 × 4 字节估算，
+    超过 max_bytes 时淘汰最久没用的。被淘汰的 PhotoImage 如果还显示在按钮上，
+    按钮那边保存的引用会让它继续有效，下次再用时重新解码。
+
+    Tk 对象只能在主线程创建，所以 preload() 不开线程，而是把解码拆成一张一张的
+    after_idle 任务，在回合之间的空闲时间里完成。
+    """
+
+    def __init__(self, root, art_dir=None, scale=1.0, max_bytes=32 * 1024 * 1024):
+        self.root = root
+        self.art_dir = art_dir
+        self.scale = scale
+        self.max_bytes = max_bytes
+        self.images = OrderedDict()  # (卡牌编号, 缩放) -> (PhotoImage 或 None, 字节数)
+        self.fonts = {}  # (字体, 字号, 粗细) -> Font，不淘汰
+        self.paths = {}  # 卡牌名 -> 卡图路径，没有图时为 None
+        self.bytes = 0
+        self.queue = []
+        self.preloading = False
+        self.hits = 0
+        self.misses = 0
+
+    def art_path(self, card):
+        if card.name in self.paths:
+            return self.paths[card.name]
+        path = None
+        if self.art_dir is not None:
+            for ext in ART_EXTENSIONS:
+                candidate = os.path.join(self.art_dir, card.name + ext)
+                if os.path.isfile(candidate):
+                    path = candidate
+                    break
+        self.paths[card.name] = path
+        return path
+
+    def image(self, card, scale=None):
+        key = (card.id, scale or self.scale)
+        entry = self.images.get(key)
+        if entry is not None:
+            self.images.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        return self.store(key, self.decode(card, key[1]))
+
+    def decode(self, card, scale):
+        path = self.art_path(card)
+        if path is None:
+            return None
+        image = tk.PhotoImage(master=self.root, file=path)
+        if scale != 1:
+            # PhotoImage 只支持整数倍放大 / 缩小，按最接近的分数处理
+            ratio = Fraction(scale).limit_denominator(8)
+            if ratio.numerator != 1:
+                image = image.zoom(ratio.numerator)
+            if ratio.denominator != 1:
+                image = image.subsample(ratio.denominator)
+        return image
+
+    def store(self, key, image):
+        size = ENTRY_OVERHEAD
+        if image is not None:
+            size += image.width() * image.height() * 4
+        self.images[key] = (image, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self.images) > 1:
+            _, (_, evicted) = self.images.popitem(last=False)
+            self.bytes -= evicted
+        return image
+
+    def font(self, size, weight="normal", family="Arial", scale=None):
+        """
+        按缩放后的字号缓存 Font 对象。不做淘汰：控件只按名字引用字体，Font 对象被回收时
+        Tk 里的命名字体也会删掉，还在用它的控件就退回默认字体。字号组合只有几种，占用很小。
+        """
+        key = (family, round(size * (scale or self.scale)), weight)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = tkfont.Font(root=self.root, family=key[0], size=key[1], weight=weight)
+        return font
+
+    # 预加载
+    def preload(self, cards, scale=None):
+        """把还没缓存的卡图排进空闲队列，每个空闲回调解码一张"""
+        scale = scale or self.scale
+        queued = set(self.queue)
+        for card in cards:
+            key = (card.id, scale)
+            if key not in self.images and key not in queued:
+                queued.add(key)
+                self.queue.append(key)
+        if self.queue and not self.preloading:
+            self.preloading = True
+            self.root.after_idle(self.preload_step)
+
+    def preload_step(self):
+        while self.queue:
+            key = self.queue.pop(0)
+            if key not in self.images:
+                self.store(key, self.decode(CARDS[key[0]], key[1]))
+                break
+        if self.queue:
+            self.root.after_idle(self.preload_step)
+        else:
+            self.preloading = False
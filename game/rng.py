@@ -0,0 +1,29 @@
+import hashlib
+import random as _random
+
+
+def derive_seed(master_seed, *keys):
+    """由主种子和若干键派生出独立的 64 位子种子"""
+    text = ":".join(str(k) for k in (master_seed,) + keys)
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+# 对局中各组件使用的随机数流
+STREAMS = ("deal", "player_deck", "npc_deck", "player_policy", "npc_policy")
+
+
+# 由一个主种子派生出按名字区分的独立随机数流，每个流第一次使用时才创建
+class RNGStreams:
+    def __init__(self, seed, rng_class=_random.Random):
+        self.seed = seed
+        self.rng_class = rng_class
+        self.streams = {}
+
+    def __getitem__(self, name):
+        rng = self.streams.get(name)
+        if rng is None:
+            rng = self.streams[name] = self.make(name)
+        return rng
+
+    def make(self, name):
+        return self.rng_class(derive_seed(self.seed, name))
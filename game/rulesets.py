@@ -0,0 +1,204 @@
+import random
+from collections import namedtuple
+
+from .cards import BALANCED_CARDS, BASE_CARDS, BASE_DECK_SIZE, DECK_SIZE
+from .effects import ALL_EFFECTS, NO_EFFECTS
+from .engine import (Match, LazyDeck, RoundResult, random_policy, MAX_ROUNDS, PLAYER_WIN, NPC_WIN, DRAW,
+                     BATTLE, NPC_NO_CARD, NPC_AUTO_PLAY, NPC_PASS)
+
+# 各历史版本规则的声明式描述
+#   no_card_penalty：玩家出牌而NPC出不了牌时NPC扣的生命值
+#   effects：heal / energy_gain 是否生效（damage_boost 各版本都生效）
+#   played："reinsert" 打出的牌立即放回牌堆；"discard" 双方对战结算后进弃牌堆、牌堆抽空后洗回，
+#           NPC出不了牌时玩家的牌既不进弃牌堆也不执行效果（test0.1 原版如此，这张牌就离开了牌组）
+#   skip："auto_play" 玩家可以跳过，NPC的牌全额造成伤害；"pass" 玩家不能跳过，
+#         只有无牌可出时本回合什么都不发生（原版这里会卡住，模拟时按双方都不出处理）
+#   draw："start" 回合开始时抽牌；"end" 结算后抽牌
+#   game_over：生命值归零时是否结束（test0.2.0 没有判断，只能打到回合上限）
+#   cards / deck_size：没有给牌组时随机发牌的卡池（每种两张）和张数
+Ruleset = namedtuple("Ruleset", "name no_card_penalty effects played skip draw game_over cards deck_size")
+
+RULESETS = {
+    "test0.1": Ruleset("test0.1", 5, True, "discard", "pass", "end", True, BASE_CARDS, BASE_DECK_SIZE),
+    "test0.2.0": Ruleset("test0.2.0", 5, False, "reinsert", "pass", "start", False, BASE_CARDS, BASE_DECK_SIZE),
+    "test0.2.1": Ruleset("test0.2.1", 5, False, "reinsert", "pass", "start", True, BASE_CARDS, BASE_DECK_SIZE),
+    "test0.2.2": Ruleset("test0.2.2", 3, False, "reinsert", "auto_play", "start", True, BALANCED_CARDS, DECK_SIZE),
+}
+DEFAULT_RULESET = "test0.2.2"
+
+
+# 把规则编译成专用的回合函数：所有分支在编译时选定，每回合不再检查规则开关
+class CompiledRuleset:
+    """
+    begin(match) 开始一个回合（回合数、能量，以及回合开始时的抽牌）；
+    step(match, choice, max_rounds=None) 与 Match.step 相同：执行玩家的选择（None 为跳过）和NPC的应对，
+    结算，未结束时做回合末的抽牌并开始下一回合（打满 max_rounds 回合时判平局），返回 RoundResult。
+    对局状态仍然放在 Match 里，所以策略、克隆、快照都照常可用。
+    """
+
+    def __init__(self, ruleset):
+        self.ruleset = ruleset
+        self.effects = ALL_EFFECTS if ruleset.effects else NO_EFFECTS
+        ops = self.effects.ops
+        penalty = ruleset.no_card_penalty
+        put_back = "discard_card" if ruleset.played == "discard" else "reinsert_card"
+
+        def take(side, index):
+            hand = side.hand
+            if index is None or not 0 <= index < len(hand):
+                return None
+            card = hand[index]
+            if card.cost > side.energy:
+                return None
+            del hand[index]
+            side.energy -= card.cost
+            return card
+
+        if ruleset.played == "discard":
+            # 出牌时先不放回，对战结算后由 settle 放进弃牌堆
+            play = take
+        else:
+            def play(side, index):
+                card = take(side, index)
+                if card is not None:
+                    side.deck.reinsert_card(card)
+                return card
+
+        if ruleset.game_over:
+            def check(match):
+                if match.player.health <= 0 or match.npc.health <= 0:
+                    match.winner = PLAYER_WIN if match.npc.health <= 0 else NPC_WIN
+        else:
+            def check(match):
+                pass
+
+        def battle(match, player_card, npc_card):
+            player, npc = match.player, match.npc
+            pv, nv = match.MATCHUPS.battle(player_card, npc_card)
+            if pv > nv:
+                npc.health -= pv - nv
+            elif nv > pv:
+                player.health -= nv - pv
+            for apply, magnitude in ops[player_card.id]:
+                apply(player, npc, magnitude)
+            for apply, magnitude in ops[npc_card.id]:
+                apply(npc, player, magnitude)
+            return RoundResult(BATTLE, player_card, npc_card, pv, nv)
+
+        if ruleset.played == "discard":
+            def settle(match, player_card, npc_card):
+                if npc_card is not None:
+                    result = battle(match, player_card, npc_card)
+                    match.player.deck.discard_card(player_card)
+                    match.npc.deck.discard_card(npc_card)
+                    return result
+                match.npc.health -= penalty
+                return RoundResult(NPC_NO_CARD, player_card, None, 0, 0)
+        else:
+            def settle(match, player_card, npc_card):
+                if npc_card is not None:
+                    return battle(match, player_card, npc_card)
+                player, npc = match.player, match.npc
+                npc.health -= penalty
+                for apply, magnitude in ops[player_card.id]:
+                    apply(player, npc, magnitude)
+                return RoundResult(NPC_NO_CARD, player_card, None, 0, 0)
+
+        if ruleset.skip == "auto_play":
+            def skip(match):
+                player, npc = match.player, match.npc
+                match.pending_card = None
+                choice = match.npc_choose() if npc.can_play_any() else None
+                npc_card = take(npc, choice)
+                if npc_card is None:
+                    return RoundResult(NPC_PASS, None, None, 0, 0)
+                getattr(npc.deck, put_back)(npc_card)
+                player.health -= npc_card.value
+                for apply, magnitude in ops[npc_card.id]:
+                    apply(npc, player, magnitude)
+                return RoundResult(NPC_AUTO_PLAY, None, npc_card, 0, npc_card.value)
+        else:
+            def skip(match):
+                match.pending_card = None
+                return RoundResult(NPC_PASS, None, None, 0, 0)
+
+        def start_energy(match):
+            match.round += 1
+            match.player.start_turn()
+            match.npc.start_turn()
+
+        def draw(match):
+            match.player.draw_card()
+            match.npc.draw_card()
+
+        if ruleset.draw == "start":
+            def begin(match):
+                start_energy(match)
+                draw(match)
+
+            def end(match):
+                pass
+        else:
+            begin = start_energy
+            end = draw
+
+        def step(match, choice, max_rounds=None):
+            if choice is None:
+                result = skip(match)
+            else:
+                player_card = play(match.player, choice)
+                if player_card is None:
+                    raise ValueError(f"无效的出牌选择：{choice}")
+                match.pending_card = player_card
+                result = settle(match, player_card, play(match.npc, match.npc_choose()))
+            check(match)
+            if match.winner is None:
+                if max_rounds is not None and match.round >= max_rounds:
+                    match.winner = DRAW
+                else:
+                    end(match)
+                    begin(match)
+            return result
+
+        self.begin = begin
+        self.step = step
+
+    def new_match(self, player_deck=None, npc_deck=None, npc_policy=random_policy, deck_class=LazyDeck,
+                  seed=None, rng_class=random.Random, rng=None):
+        """
+        按这套规则创建对局（扣血、效果表和发牌写进 Match，界面和策略读到的是同一套规则）。
+        rng 同 Match：所有组件共用一个生成器，传入全局 random 时随机数的消耗顺序与原版脚本相同。
+        """
+        match = Match(player_deck, npc_deck, rng=rng, npc_policy=npc_policy, deck_class=deck_class, seed=seed,
+                      rng_class=rng_class, effects=self.effects,
+                      deck_cards=self.ruleset.cards, deck_size=self.ruleset.deck_size)
+        match.no_card_penalty = self.ruleset.no_card_penalty
+        return match
+
+
+_COMPILED = {}
+
+
+def compile_ruleset(ruleset):
+    """ruleset 为 Ruleset 或 RULESETS 里的名字，同一套规则只编译一次"""
+    if isinstance(ruleset, str):
+        if ruleset not in RULESETS:
+            raise ValueError(f"未知的规则版本：{ruleset}（可选：{', '.join(RULESETS)}）")
+        ruleset = RULESETS[ruleset]
+    compiled = _COMPILED.get(ruleset)
+    if compiled is None:
+        compiled = _COMPILED[ruleset] = CompiledRuleset(ruleset)
+    return compiled
+
+
+def run_match(ruleset=DEFAULT_RULESET, seed=None, player_policy=random_policy, npc_policy=random_policy,
+              player_deck=None, npc_deck=None, max_rounds=MAX_ROUNDS, deck_class=LazyDeck,
+              rng_class=random.Random):
+    """按指定版本的规则无界面地跑完一局，同样的种子在 test0.2.2 下与 engine.run_match 结果相同"""
+    rules = compile_ruleset(ruleset)
+    match = rules.new_match(player_deck, npc_deck, npc_policy, deck_class, seed, rng_class)
+    player, npc, rng, step = match.player, match.npc, match.player_policy_rng, rules.step
+    rules.begin(match)
+    while match.winner is None:
+        step(match, player_policy(player, npc, rng, match), max_rounds)
+    return match
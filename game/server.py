@@ -0,0 +1,183 @@
+import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from .engine import Match, random_policy, PLAYER_WIN, NPC_WIN, DRAW, MAX_ROUNDS
+
+# 按行的文本协议（UTF-8，每行一条）
+#
+#   客户端 -> 服务器：
+#     PLAY <手牌下标>      出牌
+#     SKIP                 跳过回合
+#     STATE                重新发送当前状态
+#     NEW                  放弃当前对局，开新的一局
+#     QUIT                 断开
+#   服务器 -> 客户端：
+#     HELLO <会话编号>
+#     STATE <回合> <玩家生命> <玩家能量> <NPC生命> <NPC能量> <手牌>
+#           手牌为逗号分隔的 卡牌编号:费用，没有手牌时为 -
+#     RESULT <回合结果类型> <玩家牌编号> <NPC牌编号> <玩家伤害> <NPC伤害>   没出牌的一方为 -
+#     OVER player|npc|draw
+#     ERR <说明>
+WINNERS = {PLAYER_WIN: "player", NPC_WIN: "npc"}
+
+
+def format_state(match):
+    p, n = match.player, match.npc
+    hand = ",".join(f"{card.id}:{card.cost}" for card in p.hand) or "-"
+    return f"STATE {match.round} {p.health} {p.energy} {n.health} {n.energy} {hand}"
+
+
+def format_result(result):
+    pc = result.player_card.id if result.player_card is not None else "-"
+    nc = result.npc_card.id if result.npc_card is not None else "-"
+    return f"RESULT {result.kind} {pc} {nc} {result.pv} {result.nv}"
+
+
+# 一个连接对应一个会话，会话里同时只有一局对局
+class Session:
+    def __init__(self, server, session_id):
+        self.server = server
+        self.id = session_id
+        self.match = None
+        self.new_match()
+
+    def new_match(self):
+        self.match = Match(npc_policy=self.server.make_policy())
+        self.match.start_turn()
+
+    async def npc_choose(self):
+        """NPC决策：耗时的策略放到线程池里算，不阻塞事件循环"""
+        if self.server.offload:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.server.executor, self.match.npc_choose)
+        return self.match.npc_choose()
+
+    async def play(self, index):
+        match = self.match
+        state, last_card = match.snapshot(), match.player.last_card
+        card = match.player.play_card(index)
+        if card is None:
+            return [f"ERR 无效的出牌选择：{index}"]
+        match.pending_card = card
+        try:
+            result = match.resolve(card, await self.npc_choose())
+        except Exception:
+            # NPC决策或结算出错时撤销玩家的出牌，对局回到这条命令之前，再由 serve_client 回 ERR
+            match.restore(state)
+            match.player.last_card = last_card
+            raise
+        return self.finish(result)
+
+    async def skip(self):
+        match = self.match
+        match.pending_card = None
+        choice = await self.npc_choose() if match.npc.can_play_any() else None
+        return self.finish(match.auto_play(choice))
+
+    def finish(self, result):
+        match = self.match
+        lines = [format_result(result)]
+        if match.winner is None and match.round >= self.server.max_rounds:
+            match.winner = DRAW
+        if match.winner is not None:
+            lines.append(f"OVER {WINNERS.get(match.winner, 'draw')}")
+            self.server.finished += 1
+        else:
+            match.start_turn()
+            lines.append(format_state(match))
+        return lines
+
+    async def handle(self, line):
+        parts = line.split()
+        if not parts:
+            return []
+        command = parts[0].upper()
+        if command == "STATE":
+            return [format_state(self.match)]
+        if command == "NEW":
+            self.new_match()
+            return [format_state(self.match)]
+        if self.match.winner is not None:
+            return ["ERR 对局已经结束，发送 NEW 开始新的一局"]
+        if command == "PLAY":
+            # str.isdigit 对 "²" 这类字符也为真，直接用 int 解析
+            try:
+                index, = map(int, parts[1:])
+            except ValueError:
+                return ["ERR 用法：PLAY <手牌下标>"]
+            return await self.play(index)
+        if command == "SKIP":
+            return await self.skip()
+        return [f"ERR 未知命令：{parts[0]}"]
+
+
+# 单个事件循环上同时托管很多局 PvE 对局
+class MatchServer:
+    def __init__(self, npc_policy=None, offload=None, workers=4, max_rounds=MAX_ROUNDS, idle_timeout=300):
+        """
+        npc_policy 为无参的工厂函数，每局调用一次得到新的策略（MCTS 这类带状态的策略每局一个）；
+        None 时使用 random_policy。offload 为真时NPC决策放到线程池里执行，默认只有
+        自定义策略才放。线程池只是让事件循环不被长时间占住，受 GIL 限制并不会更快。
+        """
+        self.make_policy = npc_policy or (lambda: random_policy)
+        self.offload = offload if offload is not None else npc_policy is not None
+        self.executor = ThreadPoolExecutor(max_workers=workers) if self.offload else None
+        self.max_rounds = max_rounds
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.ids = itertools.count(1)
+        self.finished = 0
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=7777, backlog=4096):
+        self.server = await asyncio.start_server(self.serve_client, host, port, backlog=backlog)
+        return self.server
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_client(self, reader, writer):
+        session = Session(self, next(self.ids))
+        self.sessions[session.id] = session
+        try:
+            writer.write(f"HELLO {session.id}\n{format_state(session.match)}\n".encode())
+            while True:
+                try:
+                    raw = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not raw:
+                    break
+                line = raw.decode("utf-8", "replace").strip()
+                if line.upper() == "QUIT":
+                    break
+                try:
+                    lines = await session.handle(line)
+                except Exception as e:
+                    # 单条命令出错只回 ERR，不断开连接，也不影响其他会话
+                    lines = [f"ERR 内部错误：{type(e).__name__}"]
+                if lines:
+                    writer.write(("\n".join(lines) + "\n").encode())
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self.sessions[session.id]
+            writer.close()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+
+async def serve(host="127.0.0.1", port=7777, npc_policy=None):
+    server = MatchServer(npc_policy)
+    await server.start(host, port)
+    print(f"对局服务器已启动：{host}:{server.port}")
+    async with server.server:
+        await server.server.serve_forever()
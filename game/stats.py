@@ -0,0 +1,60 @@
+import math
+import random
+from collections import Counter
+
+from .engine import Deck, InsertDeck, LazyDeck
+
+
+def chi2_sf(x, dof):
+    """卡方分布的上侧概率（Wilson-Hilferty 近似，自由度较大时足够准确）"""
+    if dof <= 0:
+        return 1.0
+    t = 2.0 / (9.0 * dof)
+    z = ((x / dof) ** (1.0 / 3.0) - (1.0 - t)) / math.sqrt(t)
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+def chi2_homogeneity(counts_a, counts_b):
+    """两组样本的卡方同质性检验，返回 (统计量, 自由度, p 值)"""
+    n_a = sum(counts_a.values())
+    n_b = sum(counts_b.values())
+    total = n_a + n_b
+    stat = 0.0
+    cells = 0
+    for key in set(counts_a) | set(counts_b):
+        a, b = counts_a.get(key, 0), counts_b.get(key, 0)
+        col = a + b
+        for observed, n in ((a, n_a), (b, n_b)):
+            expected = col * n / total
+            stat += (observed - expected) ** 2 / expected
+        cells += 1
+    dof = cells - 1
+    return stat, dof, chi2_sf(stat, dof)
+
+
+def reinsert_scenario(deck_class, rng, size=6):
+    """
+    固定的一串抽牌/放回操作，返回抽到的牌。
+    覆盖了初始洗牌、放回后再抽、以及抽到刚放回的牌的情况。
+    """
+    deck = deck_class(list(range(size)), rng)
+    a, b = deck.draw(2)
+    deck.reinsert_card(a)
+    c = deck.draw_one()
+    deck.reinsert_card(b)
+    d = deck.draw_one()
+    return a, c, d
+
+
+def check_reinsert_distribution(trials=30000, seed=0, deck_classes=(InsertDeck, LazyDeck)):
+    """
+    检验各放回方式的抽牌分布与整体重洗（Deck）一致。
+    返回 {类名: (统计量, 自由度, p 值)}，p 值过小说明分布不同。
+    """
+    rng = random.Random(seed)
+    baseline = Counter(reinsert_scenario(Deck, rng) for _ in range(trials))
+    results = {}
+    for deck_class in deck_classes:
+        counts = Counter(reinsert_scenario(deck_class, rng) for _ in range(trials))
+        results[deck_class.__name__] = chi2_homogeneity(baseline, counts)
+    return results
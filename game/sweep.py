@@ -0,0 +1,170 @@
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .batch import MatchStats
+from .cards import BALANCED_CARDS, DECK_SIZE, Card, generate_random_deck
+from .engine import MAX_ROUNDS
+from .rng import derive_seed
+from .rulesets import DEFAULT_RULESET, compile_ruleset, run_match
+
+FIELD_NAMES = {"value": "攻", "cost": "费", "effect": "效"}
+
+# 一个待评估的卡牌变体：在 BALANCED_CARDS 中第 index 张卡的 field 上加 delta（delta 为 0 即原卡）
+Variant = namedtuple("Variant", "index field delta")
+
+
+def tunable_effects(rules=DEFAULT_RULESET):
+    """规则下生效的效果名，None 表示全部；damage_boost 在对战表里，各版本都生效"""
+    enabled = compile_ruleset(rules).effects.enabled
+    return None if enabled is None else enabled | {"damage_boost"}
+
+
+def variant_card(card, field, delta, enabled=None):
+    """
+    返回修改后的卡牌；数值不能小于 0，效果只调整 enabled 里的（None 为全部），
+    没有可调整的效果时不能调整效果，改不了时返回 None
+    """
+    value, cost, effects = card.value, card.cost, card.effects
+    if field == "value":
+        value += delta
+    elif field == "cost":
+        cost += delta
+    elif field == "effect":
+        if not any(enabled is None or name in enabled for name in effects):
+            return None
+        effects = {name: magnitude + delta if enabled is None or name in enabled else magnitude
+                   for name, magnitude in effects.items()}
+    else:
+        raise ValueError(f"未知的调整项：{field}")
+    if value < 0 or cost < 0 or any(magnitude < 0 for magnitude in effects.values()):
+        return None
+    return Card(card.name, card.attribute, value, cost, {k: v for k, v in effects.items() if v})
+
+
+def make_variants(deltas=(-1, 1), fields=("value", "cost", "effect"), cards=BALANCED_CARDS, rules=DEFAULT_RULESET):
+    """效果数值只在 rules 下生效时才调整（默认规则里 heal / energy_gain 不生效）"""
+    enabled = tunable_effects(rules)
+    variants = []
+    for index, card in enumerate(cards):
+        variants.append(Variant(index, None, 0))
+        for field in fields:
+            for delta in deltas:
+                if delta and variant_card(card, field, delta, enabled) is not None:
+                    variants.append(Variant(index, field, delta))
+    return variants
+
+
+def run_variant_chunk(variant, seed, count, max_rounds=MAX_ROUNDS, rules=DEFAULT_RULESET):
+    """
+    玩家牌组固定带两张变体卡，其余 13 张从另外 11 种卡（每种两张）中随机抽，
+    NPC 使用原始卡池的随机牌组。胜率高于 50% 说明这张卡（在这组数值下）偏强。
+    对局按 rules 的规则进行（默认为当前版本），卡牌效果是否生效也由规则决定。
+    """
+    card = BALANCED_CARDS[variant.index]
+    if variant.field is not None:
+        card = variant_card(card, variant.field, variant.delta, tunable_effects(rules))
+    rest = [c for i, c in enumerate(BALANCED_CARDS) if i != variant.index] * 2
+    rng = random.Random(seed)
+    stats = MatchStats()
+    for _ in range(count):
+        deck = [card, card] + rng.sample(rest, DECK_SIZE - 2)
+        stats.add(run_match(rules, rng.getrandbits(64), player_deck=deck, npc_deck=generate_random_deck(rng),
+                            max_rounds=max_rounds))
+    return stats
+
+
+def settled(stats, tolerance, max_matches):
+    """95% 区间半宽不超过 tolerance，或者已经跑满 max_matches 局"""
+    if stats.matches >= max_matches:
+        return True
+    lo, hi = stats.win_rate_interval()
+    return (hi - lo) / 2 <= tolerance
+
+
+def sweep(variants, master_seed=0, workers=None, chunk_size=500, tolerance=0.02, max_matches=20000,
+          rules=DEFAULT_RULESET):
+    """
+    按 rules 的规则并行评估所有变体，返回 {Variant: MatchStats}。每个变体按块追加对局，
+    置信区间足够窄就不再提交新的块（已经在途的块仍会合并进来）。
+    """
+    results = {v: MatchStats() for v in variants}
+    submitted = dict.fromkeys(variants, 0)  # 已提交的块数，也用来派生种子
+    workers = workers or os.cpu_count() or 1
+
+    def next_task():
+        # 优先给已提交对局最少的未完成变体
+        open_variants = [v for v in variants
+                         if not settled(results[v], tolerance, max_matches)
+                         and submitted[v] * chunk_size < max_matches]
+        if not open_variants:
+            return None
+        variant = min(open_variants, key=lambda v: submitted[v])
+        chunk = submitted[variant]
+        submitted[variant] += 1
+        count = min(chunk_size, max_matches - chunk * chunk_size)
+        return variant, derive_seed(master_seed, "sweep", *variant, chunk), count, MAX_ROUNDS, rules
+
+    if workers == 1:
+        task = next_task()
+        while task is not None:
+            variant = task[0]
+            results[variant].merge(run_variant_chunk(*task))
+            task = next_task()
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def submit_next():
+            task = next_task()
+            if task is None:
+                return False
+            pending[pool.submit(run_variant_chunk, *task)] = task[0]
+            return True
+
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)].merge(future.result())
+            while len(pending) < workers * 2 and submit_next():
+                pass
+    return results
+
+
+def verdict(stats):
+    lo, hi = stats.win_rate_interval()
+    if lo > 0.5:
+        return "偏强"
+    if hi < 0.5:
+        return "偏弱"
+    return "平衡"
+
+
+def format_ranking(results, cards=BALANCED_CARDS):
+    """按原卡胜率偏离 50% 的程度排序，列出各项调整后的胜率和最接近 50% 的调整"""
+    rows = []
+    for index, card in enumerate(cards):
+        base = results.get(Variant(index, None, 0))
+        if base is None:
+            continue
+        tweaks = sorted((v, s) for v, s in results.items() if v.index == index and v.field is not None)
+        rows.append((abs(base.win_rate - 0.5), index, card, base, tweaks))
+    rows.sort(key=lambda row: row[:2], reverse=True)
+
+    lines = ["卡牌        攻 费 效果          胜率     95%区间           结论  对局数  调整后胜率"]
+    for _, index, card, base, tweaks in rows:
+        lo, hi = base.win_rate_interval()
+        effects = ",".join(f"{k}={v}" for k, v in card.effects.items()) or "-"
+        line = (f"{card.name:<8}  {card.value:>2} {card.cost:>2} {effects:<14} {base.win_rate:.4f}  "
+                f"[{lo:.4f}, {hi:.4f}]  {verdict(base)}  {base.matches:>6}  ")
+        line += " ".join(f"{FIELD_NAMES[v.field]}{v.delta:+d}:{s.win_rate:.3f}" for v, s in tweaks)
+        if tweaks and verdict(base) != "平衡":
+            best, _ = min(tweaks, key=lambda t: abs(t[1].win_rate - 0.5))
+            line += f"  建议：{FIELD_NAMES[best.field]}{best.delta:+d}"
+        lines.append(line)
+    return "\n".join(lines)
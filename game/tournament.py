@@ -0,0 +1,267 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import combinations
+
+from .engine import run_match, PLAYER_WIN, NPC_WIN, MAX_ROUNDS
+from .policies import POLICIES
+from .rng import derive_seed
+
+
+def play_pairing(a, b, seed, count, max_rounds=MAX_ROUNDS):
+    """
+    a 和 b 用同一个种子换座位各打一局（双方拿到的牌完全相同，抵消先手和牌运），
+    共 count 对。返回 a 每局的得分列表：胜 1、平 0.5、负 0。
+    策略按名字在子进程里创建，每局一个新实例。
+    """
+    scores = []
+    for i in range(count):
+        match_seed = derive_seed(seed, i)
+        for a_is_player in (True, False):
+            player, npc = (a, b) if a_is_player else (b, a)
+            match = run_match(match_seed, POLICIES[player](), POLICIES[npc](), max_rounds=max_rounds)
+            if match.winner == PLAYER_WIN:
+                score = 1.0
+            elif match.winner == NPC_WIN:
+                score = 0.0
+            else:
+                score = 0.5
+            scores.append(score if a_is_player else 1.0 - score)
+    return scores
+
+
+# 增量 Elo：按提交顺序逐局更新，K 值随已下局数递减。它用于瑞士制配对和展示，
+# K 衰减会让评分变化越来越小，所以不用它判断收敛（见 fit_ratings）
+class Elo:
+    def __init__(self, names, initial=1500.0, k=32.0, k_min=1.0, decay=100):
+        self.ratings = dict.fromkeys(names, initial)
+        self.games = dict.fromkeys(names, 0)
+        self.k = k
+        self.k_min = k_min
+        self.decay = decay
+
+    def expected(self, a, b):
+        return 1.0 / (1.0 + 10 ** ((self.ratings[b] - self.ratings[a]) / 400))
+
+    def k_factor(self, name):
+        return max(self.k_min, self.k * self.decay / (self.decay + self.games[name]))
+
+    def update(self, a, b, score):
+        """score 为 a 的得分"""
+        delta = score - self.expected(a, b)
+        self.ratings[a] += self.k_factor(a) * delta
+        self.ratings[b] -= self.k_factor(b) * delta
+        self.games[a] += 1
+        self.games[b] += 1
+
+
+def fit_ratings(names, played, iterations=200, prior=1.0):
+    """
+    按累计战绩做 Bradley-Terry 最大似然拟合（MM 迭代），换算成 Elo 刻度、平均 1500。
+    结果与对局顺序和 K 值无关，只随样本增加而稳定；每个交过手的组合先加 prior 局
+    平局，全胜或全负时评分也是有限值。played 为 {frozenset((a, b)): PairStats}。
+    """
+    wins = dict.fromkeys(names, 0.0)
+    games = {}
+    for key, stats in played.items():
+        a, b = sorted(key)
+        n = stats.games + prior
+        points = stats.points + prior / 2  # a 的得分
+        wins[a] += points
+        wins[b] += n - points
+        games[a, b] = games[b, a] = n
+    strength = dict.fromkeys(names, 1.0)
+    for _ in range(iterations):
+        new = {}
+        for name in names:
+            denominator = sum(n / (strength[name] + strength[other])
+                              for (first, other), n in games.items() if first == name)
+            new[name] = wins[name] / denominator if denominator else strength[name]
+        scale = math.exp(sum(math.log(s) for s in new.values()) / len(new))
+        new = {name: s / scale for name, s in new.items()}
+        done = max(abs(new[n] - strength[n]) for n in names) < 1e-12
+        strength = new
+        if done:
+            break
+    return {name: 1500.0 + 400 * math.log10(strength[name]) for name in names}
+
+
+def round_robin_pairings(names, ratings, played):
+    return list(combinations(names, 2))
+
+
+def swiss_pairings(names, ratings, played):
+    """
+    按当前评分排序后相邻配对，尽量避开已经交手次数最多的组合；
+    人数为奇数时评分最低的一方本轮轮空。
+    """
+    order = sorted(names, key=lambda n: -ratings[n])
+    pairs = []
+    while len(order) > 1:
+        a = order.pop(0)
+        b = min(order, key=lambda n: (played.get(frozenset((a, n)), 0), order.index(n)))
+        order.remove(b)
+        pairs.append((a, b))
+    return pairs
+
+
+PAIRINGS = {"round-robin": round_robin_pairings, "swiss": swiss_pairings}
+
+
+# 单个组合的累计战绩
+class PairStats:
+    def __init__(self):
+        self.points = 0.0
+        self.games = 0
+
+    @property
+    def score(self):
+        return self.points / self.games if self.games else 0.5
+
+
+class Tournament:
+    """
+    策略按名字参赛（见 policies.POLICIES）。每一轮按赛制配对，每个组合打 games 局
+    （games // 2 个种子，每个种子换座位各一局），按 chunk_size 分块交给进程池；
+    块的结果按提交顺序合并进 Elo（先完成的块等前面的块），结果与进程数无关。
+    每轮结束时按累计战绩拟合评分（fit_ratings），所有评分的变化都小于 tolerance、
+    连续 patience 轮后提前结束，否则最多打 max_rounds 轮。
+    """
+
+    def __init__(self, names, pairing="round-robin", games=20, chunk_size=10, master_seed=0,
+                 tolerance=2.0, patience=2, max_rounds=50, max_match_rounds=MAX_ROUNDS):
+        unknown = [n for n in names if n not in POLICIES]
+        if unknown:
+            raise ValueError(f"未知的策略：{', '.join(unknown)}（可选：{', '.join(POLICIES)}）")
+        if len(names) < 2:
+            raise ValueError("至少需要两个策略")
+        self.names = list(names)
+        self.pairing = PAIRINGS[pairing]
+        self.pairs_per_round = max(1, games // 2)
+        self.chunk_size = chunk_size
+        self.master_seed = master_seed
+        self.tolerance = tolerance
+        self.patience = patience
+        self.max_rounds = max_rounds
+        self.max_match_rounds = max_match_rounds
+        self.elo = Elo(self.names)
+        self.played = {}  # frozenset((a, b)) -> PairStats，a、b 按名字排序后取得分
+        self.rounds = 0
+        self.ratings = dict.fromkeys(self.names, 1500.0)  # 拟合评分
+        self.history = []  # 每轮结束时的拟合评分
+        self.converged = False
+
+    def tasks(self, round_index):
+        pairs = self.pairing(self.names, self.elo.ratings, {k: v.games for k, v in self.played.items()})
+        for a, b in pairs:
+            for chunk, start in enumerate(range(0, self.pairs_per_round, self.chunk_size)):
+                count = min(self.chunk_size, self.pairs_per_round - start)
+                yield a, b, derive_seed(self.master_seed, "tournament", round_index, a, b, chunk), count
+
+    def merge(self, a, b, scores):
+        stats = self.played.setdefault(frozenset((a, b)), PairStats())
+        first = min(a, b)
+        for score in scores:
+            self.elo.update(a, b, score)
+            stats.points += score if a == first else 1.0 - score
+            stats.games += 1
+
+    def pair_score(self, a, b):
+        """a 对 b 的得分率"""
+        stats = self.played.get(frozenset((a, b)))
+        if stats is None:
+            return None
+        return stats.score if a == min(a, b) else 1.0 - stats.score
+
+    def end_round(self):
+        before = self.ratings
+        self.ratings = fit_ratings(self.names, self.played)
+        self.rounds += 1
+        self.history.append(self.ratings)
+        return max(abs(self.ratings[n] - before[n]) for n in self.names)
+
+    def run(self, workers=None, progress=None):
+        """progress(轮次, 最大评分变化) 在每轮结束时调用"""
+        workers = workers or os.cpu_count() or 1
+        calm = 0
+        if workers == 1:
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            for round_index in range(self.max_rounds):
+                self.run_round(round_index, pool, workers)
+                change = self.end_round()
+                if progress is not None:
+                    progress(self.rounds, change)
+                calm = calm + 1 if change < self.tolerance else 0
+                if calm >= self.patience:
+                    self.converged = True
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self
+
+    def run_round(self, round_index, pool, workers):
+        tasks = self.tasks(round_index)
+        if pool is None:
+            for a, b, seed, count in tasks:
+                self.merge(a, b, play_pairing(a, b, seed, count, self.max_match_rounds))
+            return
+        pending = {}  # future -> 提交序号
+        finished = {}  # 提交序号 -> (a, b, 得分)，等前面的块都合并了才合并
+        order = [0, 0]  # 下一个提交序号、下一个要合并的序号
+
+        def submit_next():
+            task = next(tasks, None)
+            if task is None:
+                return False
+            a, b, seed, count = task
+            pending[pool.submit(play_pairing, a, b, seed, count, self.max_match_rounds)] = (order[0], a, b)
+            order[0] += 1
+            return True
+
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, a, b = pending.pop(future)
+                finished[index] = a, b, future.result()
+                submit_next()
+            while order[1] in finished:
+                self.merge(*finished.pop(order[1]))
+                order[1] += 1
+
+    def standings(self):
+        """[(名字, 拟合评分, Elo, 局数, 总得分率)]，按拟合评分从高到低"""
+        rows = []
+        for name in self.names:
+            points = games = 0
+            for other in self.names:
+                stats = self.played.get(frozenset((name, other))) if other != name else None
+                if stats is not None:
+                    points += self.pair_score(name, other) * stats.games
+                    games += stats.games
+            rows.append((name, self.ratings[name], self.elo.ratings[name], games, points / games if games else 0.0))
+        rows.sort(key=lambda row: -row[1])
+        return rows
+
+
+def format_standings(tournament):
+    standings = tournament.standings()
+    names = [row[0] for row in standings]
+    width = max(8, max(len(n) for n in names) + 2)
+    lines = [f"{'名次':<4}{'策略':<{width}}{'评分':>8}{'Elo':>8}{'局数':>8}{'得分率':>8}   "
+             + "".join(f"{n:>{width}}" for n in names)]
+    for rank, (name, rating, elo, games, score) in enumerate(standings, 1):
+        cells = []
+        for other in names:
+            s = tournament.pair_score(name, other) if other != name else None
+            cells.append(f"{'-' if s is None else f'{s:.3f}':>{width}}")
+        lines.append(f"{rank:<4}{name:<{width}}{rating:>8.1f}{elo:>8.1f}{games:>8}{score:>8.3f}   " + "".join(cells))
+    state = "评分已收敛" if tournament.converged else "达到轮数上限"
+    lines.append(f"共 {tournament.rounds} 轮，{state}")
+    return "\n".join(lines)
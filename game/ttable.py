@@ -0,0 +1,95 @@
+import sys
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+def state_hash(*parts):
+    """
+    规范局面的 64 位键：各部分须是整数 / None 组成的（嵌套）元组，多重集（手牌、牌堆）先排好序。
+    整数和元组的 hash 与进程无关，同一局面在不同对局、不同搜索里得到同一个键；
+    键只存一个整数，不同局面碰撞的概率在 2**-64 量级，置换表可以接受。
+    """
+    return hash(parts)
+
+
+def entry_bytes(key, value):
+    """一条记录的实际占用：OrderedDict 的节点加上键和值（值为元组时连同元素）"""
+    size = TranspositionTable.NODE_BYTES + sys.getsizeof(key) + sys.getsizeof(value)
+    if isinstance(value, tuple):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+# 有上限的 LRU 置换表，供搜索记忆局面的求值；SHARED_TABLE 由各个前瞻策略共用
+class TranspositionTable:
+    """
+    键用 state_hash 生成，不同规则、不同用途的记录要把区分它们的信息一起放进键里。
+    max_entries 限制条数，max_bytes 按 entry_bytes 累计的实际占用限制内存。
+    """
+    NODE_BYTES = 100  # OrderedDict 每条记录的节点和哈希表开销（tracemalloc 实测约 99 字节）
+
+    def __init__(self, max_entries=1000000, max_bytes=None):
+        if max_entries < 1 or (max_bytes is not None and max_bytes < self.NODE_BYTES):
+            raise ValueError("置换表容量至少为 1 条记录")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        value = self.entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        entries = self.entries
+        old = entries.get(key, _MISSING)
+        if old is not _MISSING:
+            self.bytes -= entry_bytes(key, old)
+        entries[key] = value
+        entries.move_to_end(key)
+        self.bytes += entry_bytes(key, value)
+        max_bytes = self.max_bytes
+        while len(entries) > self.max_entries or (max_bytes is not None and self.bytes > max_bytes):
+            self.bytes -= entry_bytes(*entries.popitem(last=False))
+            self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
+# 进程内共享的置换表：残局求解器默认都用它，玩家和NPC两边、前后几局里重复的局面只查一次表
+SHARED_TABLE = TranspositionTable(max_bytes=256 * 1024 * 1024)
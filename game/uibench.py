@@ -0,0 +1,43 @@
+import random
+import time
+
+from .engine import Match, random_policy
+from .gui import Game
+
+
+def time_turns(turns=300, seed=0):
+    """
+    界面计时：随机走 turns 个回合，每回合调用一次 Game.start_turn 并强制完成布局
+    （update_idletasks），返回每回合耗时（毫秒）。需要可用的显示器。
+    """
+    rng = random.Random(seed)
+    game = Game(Match(seed=seed))
+    times = []
+    try:
+        for _ in range(turns):
+            match = game.match
+            if match.winner is not None:
+                # 对局结束后换一局继续计时，复用同一个窗口
+                game.match = match = Match(seed=rng.getrandbits(64))
+                game.player, game.npc = match.player, match.npc
+            choice = random_policy(match.player, match.npc, rng)
+            if choice is None:
+                match.skip()
+            else:
+                match.play(choice)
+            if match.winner is not None:
+                continue
+            start = time.perf_counter()
+            game.start_turn()
+            game.root.update_idletasks()
+            times.append((time.perf_counter() - start) * 1000)
+    finally:
+        game.root.destroy()
+    return times
+
+
+def report(times):
+    times = sorted(times)
+    n = len(times)
+    return (f"回合数：{n}  平均：{sum(times) / n:.3f}ms  中位数：{times[n // 2]:.3f}ms  "
+            f"p95：{times[int(n * 0.95)]:.3f}ms  最大：{times[-1]:.3f}ms")
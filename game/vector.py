@@ -0,0 +1,183 @@
+"""
+基于 NumPy 的向量化对局引擎：一次推进 K 局对局。
+
+手牌和牌堆都用每种卡牌的张数表示。test0.2.2 每次出牌后都会把牌堆整体洗一遍，
+所以抽牌等价于按张数均匀抽取一张；随机策略等价于按张数在可出的卡牌中抽取。
+结果与 Match 在统计意义上一致，但不是逐局相同。
+"""
+import numpy as np
+
+from .batch import MatchStats
+from .cards import Attribute, BALANCED_CARDS, DECK_SIZE
+from .engine import RESTRAINT, battle_values, PLAYER_WIN, NPC_WIN, DRAW, MAX_ROUNDS, Match
+
+ATTRIBUTES = list(Attribute)
+ATTR_CODE = {attr: i for i, attr in enumerate(ATTRIBUTES)}
+
+PLAYER_SIDE = 0
+NPC_SIDE = 1
+
+
+def restraint_matrix(restraint=RESTRAINT):
+    """4x4 克制矩阵，m[a1, a2] 与 calculate_restraint(a1, a2) 相同"""
+    m = np.zeros((len(ATTRIBUTES), len(ATTRIBUTES)), np.int8)
+    for attr, target in restraint.items():
+        if target is not None:
+            m[ATTR_CODE[attr], ATTR_CODE[target]] = 1
+            m[ATTR_CODE[target], ATTR_CODE[attr]] = -1
+    return m
+
+
+# 卡牌数值表（结构数组），卡牌编号为在 cards 中的下标
+class CardTable:
+    def __init__(self, cards=BALANCED_CARDS, restraint=RESTRAINT):
+        self.cards = list(cards)
+        self.ids = {card.id: i for i, card in enumerate(self.cards)}
+        self.attr = np.array([ATTR_CODE[c.attribute] for c in self.cards], np.int8)
+        self.value = np.array([c.value for c in self.cards], np.int32)
+        self.cost = np.array([c.cost for c in self.cards], np.int32)
+        self.boost = np.array([c.damage_boost for c in self.cards], np.int32)
+        self.restraint = restraint_matrix(restraint)
+        # 对战表：pv[a, b]、nv[a, b] 为玩家出 a、NPC出 b 时的数值
+        values = np.array([[battle_values(restraint, a, b) for b in self.cards] for a in self.cards], np.int32)
+        self.pv = np.ascontiguousarray(values[:, :, 0])
+        self.nv = np.ascontiguousarray(values[:, :, 1])
+
+    def __len__(self):
+        return len(self.cards)
+
+    def counts(self, deck):
+        """牌组 -> 每种卡牌的张数"""
+        return np.bincount([self.ids[card.id] for card in deck], minlength=len(self.cards))
+
+    def battle(self, p_ids, n_ids):
+        """一次结算多组出牌，与 Match.battle 相同"""
+        return self.pv[p_ids, n_ids], self.nv[p_ids, n_ids]
+
+
+class VectorMatches:
+    def __init__(self, k, seed=None, player_deck=None, npc_deck=None, table=None,
+                 max_health=30, max_energy=10, energy_per_turn=3,
+                 no_card_penalty=Match.no_card_penalty, initial_hand=Match.initial_hand):
+        self.k = k
+        self.table = table or CardTable()
+        self.rng = np.random.default_rng(seed)
+        self.max_energy = max_energy
+        self.energy_per_turn = energy_per_turn
+        self.no_card_penalty = no_card_penalty
+
+        c = len(self.table)
+        self.pile = np.empty((2, k, c), np.int32)
+        self.pile[PLAYER_SIDE] = self.deck_counts(player_deck)
+        self.pile[NPC_SIDE] = self.deck_counts(npc_deck)
+        self.hand = np.zeros((2, k, c), np.int32)
+        self.health = np.full((2, k), max_health, np.int32)
+        self.energy = np.zeros((2, k), np.int32)
+        self.round = 0
+        self.winner = np.zeros(k, np.int8)
+        self.rounds = np.zeros(k, np.int32)
+        self.active = np.ones(k, bool)
+
+        rows = np.arange(k)
+        for _ in range(initial_hand):
+            self.draw(PLAYER_SIDE, rows)
+            self.draw(NPC_SIDE, rows)
+
+    def deck_counts(self, deck):
+        if deck is not None:
+            return np.broadcast_to(self.table.counts(deck), (self.k, len(self.table)))
+        # 与 generate_random_deck 相同：从每种两张的卡池中不放回抽 DECK_SIZE 张
+        c = len(self.table)
+        slots = self.rng.random((self.k, 2 * c)).argsort(axis=1)[:, :DECK_SIZE] % c
+        flat = slots + (np.arange(self.k) * c)[:, None]
+        return np.bincount(flat.ravel(), minlength=self.k * c).reshape(self.k, c)
+
+    def sample(self, weights):
+        """按权重每行抽一个下标，权重全为 0 的行返回 -1"""
+        cum = weights.cumsum(axis=1)
+        total = cum[:, -1]
+        u = self.rng.random(len(weights)) * total
+        ids = (cum <= u[:, None]).sum(axis=1)
+        return np.where(total > 0, ids, -1)
+
+    def draw(self, side, rows):
+        ids = self.sample(self.pile[side, rows])
+        ok = ids >= 0
+        r, c = rows[ok], ids[ok]
+        self.pile[side, r, c] -= 1
+        self.hand[side, r, c] += 1
+
+    def choose(self, side, rows):
+        """随机策略：在能量足够的手牌中均匀选一张"""
+        affordable = self.table.cost[None, :] <= self.energy[side, rows][:, None]
+        return self.sample(self.hand[side, rows] * affordable)
+
+    def play(self, side, rows, ids):
+        ok = ids >= 0
+        r, c = rows[ok], ids[ok]
+        self.hand[side, r, c] -= 1
+        self.pile[side, r, c] += 1
+        self.energy[side, r] -= self.table.cost[c]
+
+    def step(self):
+        """所有未结束的对局推进一回合，返回推进的对局数"""
+        rows = np.flatnonzero(self.active)
+        if not rows.size:
+            return 0
+        self.round += 1
+        self.rounds[rows] = self.round
+        self.energy[:, rows] = np.minimum(self.energy[:, rows] + self.energy_per_turn, self.max_energy)
+        self.draw(PLAYER_SIDE, rows)
+        self.draw(NPC_SIDE, rows)
+
+        p = self.choose(PLAYER_SIDE, rows)
+        self.play(PLAYER_SIDE, rows, p)
+        n = self.choose(NPC_SIDE, rows)
+        self.play(NPC_SIDE, rows, n)
+
+        played = p >= 0
+        npc_played = n >= 0
+
+        # 双方出牌：克制减半、damage_boost、差值扣血
+        both = played & npc_played
+        pv, nv = self.table.battle(p[both], n[both])
+        diff = pv - nv
+        b = rows[both]
+        self.health[NPC_SIDE, b] -= np.maximum(diff, 0)
+        self.health[PLAYER_SIDE, b] -= np.maximum(-diff, 0)
+
+        # NPC无法出牌
+        self.health[NPC_SIDE, rows[played & ~npc_played]] -= self.no_card_penalty
+
+        # 玩家跳过，NPC的牌全额造成伤害
+        auto = ~played & npc_played
+        self.health[PLAYER_SIDE, rows[auto]] -= self.table.value[n[auto]]
+
+        over = (self.health[PLAYER_SIDE, rows] <= 0) | (self.health[NPC_SIDE, rows] <= 0)
+        done = rows[over]
+        self.winner[done] = np.where(self.health[NPC_SIDE, done] <= 0, PLAYER_WIN, NPC_WIN)
+        self.active[done] = False
+        return rows.size
+
+    def run(self, max_rounds=MAX_ROUNDS):
+        for _ in range(max_rounds):
+            if not self.step():
+                break
+        self.winner[self.active] = DRAW
+        self.active[:] = False
+        return self
+
+    def stats(self):
+        stats = MatchStats()
+        stats.matches = self.k
+        stats.wins = int((self.winner == PLAYER_WIN).sum())
+        stats.losses = int((self.winner == NPC_WIN).sum())
+        rounds = self.rounds.astype(np.int64)
+        stats.rounds = int(rounds.sum())
+        stats.rounds_sq = int((rounds * rounds).sum())
+        return stats
+
+
+def run_matches(k, seed=None, player_deck=None, npc_deck=None, max_rounds=MAX_ROUNDS, table=None):
+    """一次性跑完 K 局随机策略对局，返回结束时的 VectorMatches"""
+    return VectorMatches(k, seed, player_deck, npc_deck, table).run(max_rounds)
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from game.engine import Deck, InsertDeck, LazyDeck, Match, random_policy
+
+DECK_CLASSES = [Deck, InsertDeck, LazyDeck]
+
+
+def choose(match, rng):
+    """双方的选择：玩家偶尔主动跳过，覆盖 NPC 自动出牌的路径"""
+    player = None if rng.random() < 0.2 else random_policy(match.player, match.npc, rng)
+    return player, random_policy(match.npc, match.player, rng)
+
+
+@pytest.mark.parametrize("deck_class", DECK_CLASSES)
+def test_apply_matches_step(deck_class):
+    """apply 与 play/skip + start_turn 的结果和状态完全相同"""
+    for seed in range(100):
+        a = Match(seed=seed, deck_class=deck_class)
+        b = Match(seed=seed, deck_class=deck_class)
+        forced = [None]
+        b.npc_policy = lambda me, opponent, rng, match: forced[0]
+        a.start_turn()
+        b.start_turn()
+        rng = random.Random(seed)
+        while a.winner is None and a.round < 200:
+            player_choice, forced[0] = choose(a, rng)
+            result, _ = a.apply(player_choice, forced[0])
+            assert b.step(player_choice) == result
+            assert a.snapshot() == b.snapshot()
+
+
+@pytest.mark.parametrize("deck_class", DECK_CLASSES)
+def test_undo_restores_every_snapshot(deck_class):
+    for seed in range(100):
+        match = Match(seed=seed, deck_class=deck_class)
+        match.start_turn()
+        rng = random.Random(seed)
+        history = []
+        while match.winner is None and match.round < 200:
+            before = match.snapshot()
+            _, record = match.apply(*choose(match, rng))
+            history.append((before, record))
+        for before, record in reversed(history):
+            match.undo(record)
+            assert match.snapshot() == before
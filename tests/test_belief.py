@@ -0,0 +1,58 @@
+from game.belief import Belief, BeliefPolicy
+from game.cards import Attribute
+from game.engine import Match, run_match, random_policy
+from game.policies import restraint_policy
+
+
+def test_attribute_probability_calibrated():
+    # 3000 局随机对局，每个玩家决策点上预测NPC手里有各属性牌的概率，和实际频率比较
+    attributes = list(Attribute)
+    predicted = dict.fromkeys(attributes, 0.0)
+    observed = dict.fromkeys(attributes, 0)
+    first_predicted = dict.fromkeys(attributes, 0.0)
+    first_observed = dict.fromkeys(attributes, 0)
+    matches, decisions = 3000, 0
+    for seed in range(matches):
+        match = Match(seed=seed)
+        belief = Belief(hand_size=len(match.npc.hand))
+        match.start_turn()
+        belief.on_draw()
+        while match.winner is None:
+            assert belief.hand_size == len(match.npc.hand)
+            for a in attributes:
+                p = belief.attribute_probability(a, next_turn=False)
+                has = any(card.attribute == a for card in match.npc.hand)
+                predicted[a] += p
+                observed[a] += has
+                if match.round == 1:
+                    first_predicted[a] += p
+                    first_observed[a] += has
+            decisions += 1
+            result = match.step(random_policy(match.player, match.npc, match.player_policy_rng, match), 200)
+            belief.observe(result, "npc")
+            if match.winner is None:
+                belief.on_draw()
+    for a in attributes:
+        # 第一回合还没有挑牌，手牌就是均匀抽取的，预测应当很准
+        assert abs(first_predicted[a] - first_observed[a]) / matches < 0.02
+        # 之后对手留在手里的牌有挑选偏差（模型不考虑），仍在几个百分点以内
+        assert abs(predicted[a] - observed[a]) / decisions < 0.06
+
+
+def test_known_deck_is_certain():
+    deck = [card for card in Match(seed=1).npc.deck.draw_pile]
+    belief = Belief.known_deck(deck, hand_size=len(deck))
+    assert belief.attribute_probability(deck[0].attribute, next_turn=False) == 1.0
+
+
+def test_belief_policy_uses_public_information_only():
+    # 信念策略不看对手的手牌：对手手牌换成同样张数的别的牌，先手决策不变
+    policy = BeliefPolicy(fallback=restraint_policy)
+    match = Match(seed=3, npc_policy=restraint_policy)
+    match.start_turn()
+    before = policy(match.player, match.npc, match.player_policy_rng, match)
+    match.npc.hand = [match.player.hand[0]] * len(match.npc.hand)
+    again = BeliefPolicy(fallback=restraint_policy)
+    assert again(match.player, match.npc, match.player_policy_rng, match) == before
+    final = run_match(5, BeliefPolicy(fallback=restraint_policy), restraint_policy)
+    assert final.winner is not None
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from game.bench import (BENCHMARKS, MAX_ALLOWED, REFERENCE, compare, load_baseline, recheck, regression, run_benchmarks,
+                        summarize)
+
+# 计时测试比较慢、又依赖机器，默认跳过：GAME_BENCH=1 python -m pytest tests/test_bench.py
+timing = pytest.mark.skipif(not os.environ.get("GAME_BENCH"), reason="设置 GAME_BENCH=1 时才运行计时测试")
+
+
+def result(ratio, spread=0.0):
+    return {"ns": ratio * 100, "ratio": ratio, "spread": spread}
+
+
+def test_summarize_uses_fastest_round():
+    # 被打断的一遍（400、900）不影响结果；参照最快的一遍是 100，次快的两边各慢 5%、0%
+    summary = summarize([200, 400, 210, 900], [100, 200, 100, 105])
+    assert summary["ns"] == 200
+    assert summary["ratio"] == 2.0
+    assert summary["spread"] == pytest.approx(0.05)
+
+
+def test_allowed_change_capped_near_threshold():
+    change, allowed = regression(result(1.3, 0.02), result(1.0, 0.01))
+    assert change == pytest.approx(0.3)
+    assert allowed == 0.1
+    assert regression(result(1.0, 0.08), result(1.0, 0.04))[1] == pytest.approx(0.12)
+    # 噪声再大，允许值也不超过 MAX_ALLOWED，慢一倍的项目一定会报出来
+    assert regression(result(2.0, 1.0), result(1.0, 1.0)) == (1.0, MAX_ALLOWED)
+
+
+def test_compare_flags_regressions():
+    baseline = {REFERENCE: result(1.0), "a": result(2.0), "b": result(2.0, 0.1)}
+    results = {REFERENCE: result(1.0), "a": result(2.3), "b": result(2.25, 0.04), "c": result(1.0)}
+    report, regressions = compare(results, baseline)
+    assert regressions == ["a"]
+    assert "c" in report
+
+
+def test_recheck_keeps_faster_retime(monkeypatch):
+    calls = []
+
+    def rerun(names, min_time):
+        calls.append(names)
+        return {REFERENCE: result(1.0), "a": result(2.1), "b": result(9.0)}
+
+    monkeypatch.setattr("game.bench.run_benchmarks", rerun)
+    baseline = {"a": result(2.0), "b": result(2.0)}
+    results = recheck({REFERENCE: result(1.0), "a": result(3.0), "b": result(2.0)}, baseline)
+    assert calls == [["a"]]  # 只重测超出允许值的项目，重测后不再超出就停
+    assert results["a"]["ratio"] == 2.1 and results["b"]["ratio"] == 2.0
+
+
+@pytest.fixture(scope="module")
+def measured():
+    return recheck(run_benchmarks(), load_baseline("baseline"))
+
+
+@timing
+@pytest.mark.parametrize("name", list(BENCHMARKS))
+def test_no_regression(name, measured):
+    base = load_baseline("baseline").get(name)
+    if base is None:
+        pytest.skip(f"基准里没有 {name}")
+    change, allowed = regression(measured[name], base)
+    assert change <= allowed, f"{name} 相对参照慢了 {change:.1%}（允许 {allowed:.0%}）"
@@ -0,0 +1,12 @@
+from game.deckbuilder import DeckBuilder
+
+
+def test_top_up_counts_partial_chunks():
+    # 150 局 = 100 + 50，再要 300 局时要补足 150 局而不是按两个整块算成 200
+    builder = DeckBuilder(population=1, base_matches=150, chunk_size=100, max_rounds=5)
+    key = builder.keys[0]
+    builder.evaluate([key], 150)
+    assert builder.cache[key].matches == 150
+    builder.evaluate([key], 300)
+    assert builder.cache[key].matches == 300
+    assert builder.submitted[key] == 300
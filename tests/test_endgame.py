@@ -0,0 +1,74 @@
+import pytest
+
+from game.endgame import EndgameSolver, EndgamePolicy, is_endgame
+from game.engine import Match, random_policy, action_index
+from game.policies import POLICIES
+
+
+def endgame_positions(count, max_health=8):
+    """随机对局打到双方生命值都不超过 max_health 时的局面"""
+    positions = []
+    seed = 0
+    while len(positions) < count:
+        match = Match(seed=seed)
+        match.start_turn()
+        while match.winner is None and not is_endgame(match, max_health):
+            match.step(random_policy(match.player, match.npc, match.player_policy_rng, match), 200)
+        if match.winner is None:
+            positions.append(match)
+        seed += 1
+    return positions
+
+
+# 不剪枝、不缓存的期望极大极小，作为求解器的参照
+def reference_player(solver, state, depth):
+    ph, pe, phand, ppile = state[:4]
+    return max(reference_npc(solver, (ph,) + solver.play(pe, phand, ppile, move) + state[4:], move, depth)
+               for move in solver.moves(pe, phand))
+
+
+def reference_npc(solver, state, player_move, depth):
+    nh, ne, nhand, npile = state[4:]
+    return min(reference_outcome(solver, state[:4] + (nh,) + solver.play(ne, nhand, npile, move),
+                                 player_move, move, depth)
+               for move in solver.moves(ne, nhand))
+
+
+def reference_outcome(solver, state, player_move, npc_move, depth):
+    ph, pe, phand, ppile, nh, ne, nhand, npile = state
+    ph, nh = solver.settle(ph, nh, player_move, npc_move)
+    if ph <= 0 or nh <= 0:
+        return 1.0 if nh <= 0 else 0.0
+    if depth <= 1:
+        return solver.leaf(ph, nh)
+    per, cap = solver.player_energy
+    pe = min(pe + per, cap)
+    per, cap = solver.npc_energy
+    ne = min(ne + per, cap)
+    return sum(p_prob * n_prob * reference_player(solver, (ph, pe, p_hand, p_pile, nh, ne, n_hand, n_pile), depth - 1)
+               for p_prob, p_hand, p_pile in solver.draws(phand, ppile)
+               for n_prob, n_hand, n_pile in solver.draws(nhand, npile))
+
+
+@pytest.mark.parametrize("match", endgame_positions(4, max_health=5))
+def test_pruned_search_matches_reference(match):
+    solver = EndgameSolver(match, horizon=2)
+    state = solver.state_of(match)
+    assert solver.solve(match).value == pytest.approx(reference_player(solver, state, 2), abs=1e-9)
+
+    # NPC应对玩家出的编号最大的可出的牌（没有可出的牌时玩家跳过）
+    move = solver.moves(match.player.energy, state[2])[-1]
+    match.pending_card = match.player.play_card(action_index(match.player, move)) if move is not None else None
+    state = solver.state_of(match)
+    assert solver.solve_npc(match).value == pytest.approx(reference_npc(solver, state, move, 2), abs=1e-9)
+
+
+def test_endgame_policy_is_registered_for_both_seats():
+    match = endgame_positions(1)[0]
+    policy = POLICIES["endgame"]()
+    assert isinstance(policy, EndgamePolicy)
+    index = policy(match.player, match.npc, match.player_policy_rng, match)
+    assert index is None or match.player.hand[index].cost <= match.player.energy
+    match.pending_card = None
+    index = policy(match.npc, match.player, match.policy_rng, match)
+    assert index is None or match.npc.hand[index].cost <= match.npc.energy
@@ -0,0 +1,37 @@
+import pytest
+
+from game.engine import Match, run_match, random_policy, DRAW
+
+
+@pytest.mark.parametrize("max_rounds", [1, 3, 10])
+def test_round_cap_reports_rounds_played(max_rounds):
+    """打满回合上限判平局时 round 等于上限，分出胜负的对局不超过上限"""
+    draws = 0
+    for seed in range(200):
+        match = run_match(seed, max_rounds=max_rounds)
+        assert 1 <= match.round <= max_rounds
+        if match.winner == DRAW:
+            draws += 1
+            assert match.round == max_rounds
+    assert draws
+
+
+def test_step_with_cap_matches_run_match():
+    match = Match(seed=7)
+    match.start_turn()
+    while match.winner is None:
+        match.step(random_policy(match.player, match.npc, match.player_policy_rng, match), 5)
+    expected = run_match(7, max_rounds=5, rng_class=match.rng_class)
+    assert (match.winner, match.round, match.player.health, match.npc.health) == \
+        (expected.winner, expected.round, expected.player.health, expected.npc.health)
+
+
+def test_vector_engine_uses_same_round_cap():
+    pytest.importorskip("numpy")
+    from game.vector import run_matches
+
+    matches = run_matches(500, seed=1, max_rounds=4)
+    draws = matches.winner == DRAW
+    assert draws.any()
+    assert (matches.rounds[draws] == 4).all()
+    assert (matches.rounds <= 4).all()
@@ -0,0 +1,66 @@
+import os
+import random
+
+import pytest
+
+from game.cards import generate_random_deck
+from game.engine import InsertDeck, Deck, run_match, DRAW
+from game.replay import ReplayReader, ReplayWriter, record_matches, replay, rebuild_index, index_path
+
+
+def summary(match):
+    return match.winner, match.round, match.player.health, match.npc.health
+
+
+def test_round_trip_with_append(tmp_path):
+    path = str(tmp_path / "out.rpl")
+    record_matches(path, 30, master_seed=1)
+    record_matches(path, 20, master_seed=2, max_rounds=5)  # 追加，其中有打满回合上限的平局
+    with ReplayReader(path) as reader:
+        assert len(reader) == 50
+        # replay 默认校验结果、回合数和双方生命值与记录一致
+        results = [summary(replay(record)) for record in reader]
+    assert any(winner == DRAW for winner, *_ in results)
+    assert all(rounds <= 5 for _, rounds, *_ in results[30:])
+
+
+@pytest.mark.parametrize("deck_class", [Deck, InsertDeck])
+def test_given_decks_and_deck_class_round_trip(tmp_path, deck_class):
+    rng = random.Random(3)
+    match = run_match(9, player_deck=generate_random_deck(rng), npc_deck=generate_random_deck(rng),
+                      deck_class=deck_class, record=True)
+    path = str(tmp_path / "decks.rpl")
+    with ReplayWriter(path) as writer:
+        writer.write(match)
+    with ReplayReader(path) as reader:
+        record = reader[0]
+    assert record.deck_class is deck_class
+    assert summary(replay(record)) == summary(match)
+
+
+def test_truncated_tail_rebuilds_index(tmp_path):
+    path = str(tmp_path / "cut.rpl")
+    record_matches(path, 10)
+    size = os.path.getsize(path)
+    # 模拟写到一半中断：数据末尾只剩半条记录，索引也比数据多一条或少一条
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00partial")
+    os.truncate(index_path(path), os.path.getsize(index_path(path)) - 8)
+
+    with ReplayWriter(path) as writer:  # 打开时发现不一致，重建索引并截掉不完整的尾部
+        assert os.path.getsize(path) == size
+        writer.write(run_match(123, record=True))
+    with ReplayReader(path) as reader:
+        assert len(reader) == 11
+        for record in reader:
+            replay(record)
+    assert rebuild_index(path) == 11
+
+
+def test_tampered_moves_are_rejected(tmp_path):
+    path = str(tmp_path / "bad.rpl")
+    record_matches(path, 1)
+    with ReplayReader(path) as reader:
+        record = reader[0]
+    with pytest.raises(ValueError):
+        replay(record._replace(player_health=record.player_health + 1))
@@ -0,0 +1,30 @@
+import pickle
+import random
+
+from game.engine import Match, random_policy
+from game.rng import RNGStreams
+
+
+def test_streams_are_deterministic_and_independent():
+    a, b = RNGStreams(5), RNGStreams(5)
+    assert b["npc_deck"].random() == a["npc_deck"].random()  # 创建顺序不影响各个流
+    assert a["deal"].random() == b["deal"].random()
+    assert RNGStreams(5)["deal"].random() != RNGStreams(5)["player_deck"].random()
+
+
+def test_match_pickles_without_touching_global_random():
+    match = Match(seed=7)
+    match.start_turn()
+    match.step(random_policy(match.player, match.npc, match.player_policy_rng, match))
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    clone = pickle.loads(pickle.dumps(match))
+    assert random.random() == expected
+
+    def finish(m):
+        while m.winner is None:
+            m.step(random_policy(m.player, m.npc, m.player_policy_rng, m), 200)
+        return m.winner, m.round, m.player.health, m.npc.health
+
+    assert finish(clone) == finish(match)
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from game.engine import Match
+from game.server import MatchServer, Session
+
+
+def broken_policy(npc, opponent, rng, match):
+    raise RuntimeError("策略出错")
+
+
+async def talk(server, commands):
+    await server.start(port=0)
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+    replies = [(await reader.readline()).decode().strip() for _ in range(2)]  # HELLO、STATE
+    for command in commands:
+        writer.write(f"{command}\n".encode())
+        await writer.drain()
+        replies.append((await reader.readline()).decode().strip())
+    writer.close()
+    await server.close()
+    return replies
+
+
+def kinds(replies):
+    return [reply.split()[0] for reply in replies]
+
+
+def test_play_rejects_non_ascii_digits():
+    replies = asyncio.run(talk(MatchServer(), ["PLAY ²", "PLAY", "PLAY 1 2", "STATE"]))
+    assert kinds(replies) == ["HELLO", "STATE", "ERR", "ERR", "ERR", "STATE"]
+
+
+def test_handler_error_replies_err_and_keeps_connection():
+    server = MatchServer(lambda: broken_policy, offload=False)
+    replies = asyncio.run(talk(server, ["SKIP", "STATE"]))
+    assert kinds(replies) == ["HELLO", "STATE", "ERR", "STATE"]
+
+
+def test_play_rolled_back_when_policy_raises():
+    # NPC策略出错时玩家的出牌被撤销：手牌、能量、牌堆都和出牌前一样
+    session = Session(MatchServer(lambda: broken_policy, offload=False), 1)
+    session.match = Match(seed=0, npc_policy=broken_policy)
+    session.match.start_turn()
+    before = session.match.snapshot()
+    index = next(i for i, card in enumerate(session.match.player.hand) if card.cost <= session.match.player.energy)
+    with pytest.raises(RuntimeError):
+        asyncio.run(session.handle(f"PLAY {index}"))
+    assert session.match.snapshot() == before
+    assert session.match.player.last_card is None
@@ -0,0 +1,27 @@
+import pytest
+
+from game.engine import Deck
+from game.stats import chi2_sf, check_reinsert_distribution
+
+ALPHA = 0.001
+
+
+# 放回时总是放到牌堆底（最后才会抽到），用来确认检验能发现分布不同
+class BottomDeck(Deck):
+    def reinsert_card(self, card):
+        self.draw_pile.insert(0, card)
+
+
+@pytest.mark.parametrize("x, dof, expected", [(18.307, 10, 0.05), (3.940, 10, 0.95), (50.892, 30, 0.01)])
+def test_chi2_sf_matches_table(x, dof, expected):
+    assert chi2_sf(x, dof) == pytest.approx(expected, abs=0.003)
+
+
+def test_reinsert_decks_match_full_reshuffle():
+    for name, (stat, dof, p) in check_reinsert_distribution(20000, seed=0).items():
+        assert p >= ALPHA, f"{name}: 卡方={stat:.1f} 自由度={dof} p={p:.6f}"
+
+
+def test_biased_reinsert_is_detected():
+    (stat, dof, p), = check_reinsert_distribution(20000, seed=0, deck_classes=(BottomDeck,)).values()
+    assert p < ALPHA
@@ -0,0 +1,21 @@
+from game.cards import BALANCED_CARDS
+from game.sweep import Variant, make_variants, run_variant_chunk
+
+
+def test_effect_variants_follow_ruleset():
+    # 当前规则里 heal / energy_gain 不生效，只调整 damage_boost；test0.1 下所有效果都调整
+    tuned = {BALANCED_CARDS[v.index].name for v in make_variants(fields=("effect",)) if v.field}
+    assert tuned == {c.name for c in BALANCED_CARDS if "damage_boost" in c.effects}
+    tuned = {BALANCED_CARDS[v.index].name for v in make_variants(fields=("effect",), rules="test0.1") if v.field}
+    assert tuned == {c.name for c in BALANCED_CARDS if c.effects}
+
+
+def test_effect_variants_change_results():
+    # 同一种子下，调整效果数值的变体要和原卡打出不同的结果（调整的效果在该规则下生效）
+    for rules in ("test0.2.2", "test0.1"):
+        for variant in make_variants(fields=("effect",), rules=rules):
+            if variant.field is None:
+                continue
+            base = run_variant_chunk(Variant(variant.index, None, 0), 1, 50, rules=rules)
+            tweaked = run_variant_chunk(variant, 1, 50, rules=rules)
+            assert (base.wins, base.losses, base.rounds) != (tweaked.wins, tweaked.losses, tweaked.rounds)
@@ -0,0 +1,33 @@
+import math
+
+import pytest
+
+from game.tournament import PairStats, Tournament, fit_ratings
+
+
+def pair(points, games):
+    stats = PairStats()
+    stats.points, stats.games = points, games
+    return stats
+
+
+def test_fit_ratings_matches_score_rate():
+    # 75% 的得分率对应 400*log10(3) ≈ 191 分的差距（prior=0 时是精确的最大似然解）
+    ratings = fit_ratings(["a", "b"], {frozenset("ab"): pair(75, 100)}, prior=0)
+    assert ratings["a"] - ratings["b"] == pytest.approx(400 * math.log10(3))
+    assert ratings["a"] + ratings["b"] == pytest.approx(3000)
+
+
+def test_fit_ratings_finite_for_clean_sweep():
+    ratings = fit_ratings(["a", "b", "c"], {frozenset("ab"): pair(10, 10), frozenset("bc"): pair(10, 10)})
+    assert ratings["a"] > ratings["b"] > ratings["c"]
+    assert all(math.isfinite(r) for r in ratings.values())
+
+
+def test_results_independent_of_workers():
+    def run(workers):
+        t = Tournament(["random", "greedy", "restraint"], games=8, chunk_size=2, max_rounds=2)
+        t.run(workers=workers)
+        return t.elo.ratings, t.ratings
+
+    assert run(1) == run(2)
@@ -0,0 +1,51 @@
+import tracemalloc
+
+import pytest
+
+from game.endgame import EndgameSolver
+from game.engine import Match
+from game.ttable import TranspositionTable, state_hash
+
+
+def test_lru_eviction_and_counters():
+    table = TranspositionTable(max_entries=2)
+    table.put("a", 1)
+    table.put("b", 2)
+    assert table.get("a") == 1  # a 变成最近使用
+    table.put("c", 3)
+    assert "b" not in table and "a" in table and "c" in table
+    assert table.get("b") is None
+    assert (table.hits, table.misses, table.evictions) == (1, 1, 1)
+    assert table.hit_rate == 0.5
+
+
+def test_byte_budget_tracks_real_size():
+    # 记下的占用要和 tracemalloc 实测的相符，按字节数的上限才有意义
+    table = TranspositionTable()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(20000):
+        table.put(state_hash((i, 3, (1, 2, 2)), 2), (i / 7, i / 3))
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert table.bytes == pytest.approx(used, rel=0.2)
+
+    capped = TranspositionTable(max_bytes=table.bytes // 2)
+    for key, value in table.entries.items():
+        capped.put(key, value)
+    assert capped.bytes <= capped.max_bytes
+    assert len(capped) == pytest.approx(len(table) / 2, rel=0.05)
+    with pytest.raises(ValueError):
+        TranspositionTable(max_bytes=1)
+
+
+def test_solvers_share_table():
+    # 同样规则的两个求解器共用一张表：第二个求解器直接命中第一个算过的局面
+    match = Match(seed=0)
+    match.start_turn()
+    match.player.health = match.npc.health = 3
+    table = TranspositionTable()
+    first = EndgameSolver(match, horizon=3, table=table).solve(match)
+    misses = table.misses
+    assert EndgameSolver(match, horizon=3, table=table).solve(match) == first
+    assert table.misses == misses and table.hits > 0